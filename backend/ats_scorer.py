@@ -0,0 +1,146 @@
+import re
+
+from resume_sections import split_resume_sections, score_verdict
+
+# -------------------------------------------------
+# LEXICONS (compiled once at import)
+# -------------------------------------------------
+WEAK_PHRASES = (
+    "worked on", "helped with", "helped to", "responsible for", "assisted in",
+    "assisted with", "involved in", "participated in", "duties included",
+    "tasked with", "worked with", "was part of",
+)
+
+STRONG_VERBS = frozenset((
+    "achieved", "accelerated", "architected", "automated", "boosted", "built",
+    "championed", "created", "cut", "delivered", "deployed", "designed",
+    "developed", "drove", "eliminated", "engineered", "established",
+    "expanded", "generated", "grew", "implemented", "improved", "increased",
+    "introduced", "launched", "led", "managed", "mentored", "migrated",
+    "optimized", "optimised", "orchestrated", "owned", "pioneered", "reduced",
+    "redesigned", "refactored", "resolved", "revamped", "saved", "scaled",
+    "shipped", "spearheaded", "streamlined", "trained", "transformed",
+))
+
+REQUIRED_SECTIONS = ("experience", "skills", "education")
+
+_WEAK_RE = re.compile(r"\b(?:" + "|".join(re.escape(p) for p in WEAK_PHRASES) + r")\b", re.IGNORECASE)
+_METRIC_RE = re.compile(r"\d+(?:\.\d+)?\s*(?:%|x\b|\+|k\b|m\b|hrs?\b|ms\b|users|customers|clients|people)|[$₹€£]\s?\d|\b\d{2,}\b", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-–•*▪●◦‣►»·]|\d{1,2}[.)])\s+")
+_FIRST_WORD_RE = re.compile(r"[A-Za-z]+")
+_SYMBOL_RE = re.compile(r"[^\x00-\x7F•–—‘’“”₹€£·▪●◦]")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+
+LONG_PARAGRAPH_WORDS = 60
+GENERIC_SUMMARY_WORDS = 25
+
+
+# -------------------------------------------------
+# SCORING
+# -------------------------------------------------
+def score_resume(text: str) -> dict:
+    """
+    Rule-based ATS pre-score.
+    Returns a provisional analysis in the same shape as the LLM result so it
+    can be shown instantly or served when the LLM is unavailable.
+    """
+    sections = split_resume_sections(text)
+
+    bullets = 0
+    bullets_with_metrics = 0
+    strong_starts = 0
+    long_paragraphs = 0
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if _BULLET_RE.match(line):
+            bullets += 1
+            body = _BULLET_RE.sub("", line, count=1)
+            if _METRIC_RE.search(body):
+                bullets_with_metrics += 1
+            first = _FIRST_WORD_RE.search(body)
+            if first and first.group().lower() in STRONG_VERBS:
+                strong_starts += 1
+        elif line.count(" ") >= LONG_PARAGRAPH_WORDS:
+            long_paragraphs += 1
+
+    weak_count = len(_WEAK_RE.findall(text))
+    symbol_count = len(_SYMBOL_RE.findall(text))
+    missing_sections = [name for name in REQUIRED_SECTIONS if name not in sections]
+    header = sections.get("header", "")
+    has_contact = bool(_EMAIL_RE.search(header) or _PHONE_RE.search(header) or _EMAIL_RE.search(text))
+    summary = sections.get("summary", "")
+
+    metric_ratio = bullets_with_metrics / bullets if bullets else 0.0
+    verb_ratio = strong_starts / bullets if bullets else 0.0
+
+    # Start from a "Good" baseline and move with the mechanical signals.
+    score = 70.0
+    score += 15 * metric_ratio - 8 * (metric_ratio < 0.2)
+    score += 10 * verb_ratio
+    score -= 6 * len(missing_sections)
+    score -= min(weak_count, 5) * 2
+    score -= min(long_paragraphs, 3) * 3
+    score -= 5 * (bullets < 4)
+    score -= 4 * (not has_contact)
+    score -= min(symbol_count, 20) * 0.25
+    overall = max(0, min(100, round(score)))
+
+    strengths = []
+    weaknesses = []
+    ats_issues = []
+    recommendations = []
+
+    if bullets and metric_ratio >= 0.4:
+        strengths.append(f"{bullets_with_metrics} of {bullets} bullets include measurable results.")
+    if bullets and verb_ratio >= 0.5:
+        strengths.append("Most bullets start with strong action verbs.")
+    if not missing_sections:
+        strengths.append("All standard sections (Experience, Skills, Education) are present.")
+
+    for name in missing_sections:
+        ats_issues.append(f"Missing a clear \"{name.title()}\" section header.")
+    if bullets < 4:
+        ats_issues.append("Few or no bullet points; ATS and recruiters scan bullets, not paragraphs.")
+    if long_paragraphs:
+        ats_issues.append(f"{long_paragraphs} long paragraph(s) that should be split into bullets.")
+    if symbol_count > 5:
+        ats_issues.append("Non-standard symbols or icons that some ATS systems cannot parse.")
+    if not has_contact:
+        ats_issues.append("No email or phone number detected near the top of the resume.")
+
+    if bullets and metric_ratio < 0.4:
+        weaknesses.append(f"Only {bullets_with_metrics} of {bullets} bullets show numbers or outcomes.")
+        recommendations.append("Add a realistic metric (%, time saved, users, revenue) to each key bullet.")
+    if weak_count:
+        weaknesses.append(f"{weak_count} vague phrase(s) such as \"worked on\" or \"helped with\".")
+        recommendations.append("Replace vague phrases with strong verbs like Built, Led, Reduced or Launched.")
+    if bullets and verb_ratio < 0.5:
+        weaknesses.append("Many bullets do not start with an action verb.")
+    if summary and summary.count(" ") < GENERIC_SUMMARY_WORDS and not _METRIC_RE.search(summary):
+        weaknesses.append("The summary is short and generic.")
+        recommendations.append("Tailor the summary to the target role with one concrete achievement.")
+    if missing_sections:
+        recommendations.append("Use standard section headers so ATS can map your content.")
+
+    if ats_issues:
+        summary_insight = ats_issues[0]
+    elif weaknesses:
+        summary_insight = weaknesses[0]
+    else:
+        summary_insight = "No mechanical ATS problems found; content quality needs a full review."
+
+    return {
+        "overall_score": overall,
+        "score_verdict": score_verdict(overall),
+        "summary_insight": summary_insight,
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "ats_issues": ats_issues,
+        "improved_bullets": [],
+        "recommendations": recommendations,
+        "provisional": True,
+    }
@@ -0,0 +1,16 @@
+"""
+Placeholder settings for importing server.py outside a deployment.
+
+server.py validates these at import; nothing is contacted with them, and
+values already set in the environment are left alone. Import this module
+before server.py (the benchmarks and tests/conftest.py both do).
+"""
+import os
+
+PLACEHOLDER_ENV = {
+    "MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "benchmark", "GROQ_API_KEY": "unused",
+    "BREVO_API_KEY": "unused", "BREVO_SENDER_EMAIL": "bench@example.com", "OTP_EXPIRY": "600",
+}
+
+for var, value in PLACEHOLDER_ENV.items():
+    os.environ.setdefault(var, value)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Compare the inline analysis document with the summary + compressed detail layout.
+
+Reports BSON bytes per analysis and the client-side cost of decoding a
+50-item history listing in each layout. Run the migration with --measure
+for the same numbers against a live database.
+
+Usage: python benchmarks/bench_analysis_storage.py [--history 50]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import bson
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Placeholder settings; server.py validates them at import
+import _server_env  # noqa: E402,F401
+
+from server import (  # noqa: E402
+    ResumeAnalysis,
+    analysis_detail,
+    analysis_summary,
+    unpack_detail,
+)
+from job_matcher import term_frequencies  # noqa: E402
+from resume_sections import evaluable_sections, section_hash  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+def sample_analysis() -> ResumeAnalysis:
+    resume_text = (CORPUS_DIR / "software_engineer.txt").read_text()
+    result = json.loads((CORPUS_DIR / "analysis_result.json").read_text())
+    section_results = [
+        {"name": name, "hash": section_hash(text), "result": {
+            "score": result["overall_score"],
+            "strengths": result["strengths"][:2],
+            "weaknesses": result["weaknesses"][:2],
+            "ats_issues": result["ats_issues"][:1],
+            "improved_bullets": result["improved_bullets"][:1],
+            "recommendations": result["recommendations"][:2],
+        }}
+        for name, text in evaluable_sections(resume_text).items()
+    ]
+    return ResumeAnalysis(
+        user_id="bench-user",
+        resume_text=resume_text[:500],
+        role_target="backend engineer",
+        prompt_version="sections-v1",
+        analysis_result=result,
+        section_results=section_results,
+        resume_terms=term_frequencies(resume_text),
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--history", type=int, default=50, help="analyses per history listing")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    analysis = sample_analysis()
+    inline = bson.encode(analysis.model_dump(mode="json"))
+    summary = bson.encode(analysis_summary(analysis))
+    detail = bson.encode(analysis_detail(analysis))
+    raw_result = len(json.dumps(analysis.model_dump(mode="json", include={"resume_text", "analysis_result", "section_results"})))
+
+    print("=" * 60)
+    print("ANALYSIS STORAGE LAYOUT")
+    print("=" * 60)
+    print(f"inline document            {len(inline):>8} B")
+    print(f"summary document           {len(summary):>8} B  ({len(summary) / len(inline):.1%} of inline)")
+    print(f"detail document            {len(detail):>8} B  (blob: {raw_result} B json -> "
+          f"{len(analysis_detail(analysis)['data'])} B zlib)")
+    print(f"summary + detail           {len(summary) + len(detail):>8} B  "
+          f"({(len(summary) + len(detail)) / len(inline):.1%} of inline)")
+
+    inline_page = [inline] * args.history
+    summary_page = [summary] * args.history
+    t_inline = timed(lambda: [bson.decode(doc) for doc in inline_page], args.repeat)
+    t_summary = timed(lambda: [bson.decode(doc) for doc in summary_page], args.repeat)
+    blob = analysis_detail(analysis)["data"]
+    t_open = timed(lambda: unpack_detail(blob), args.repeat * 10)
+
+    print("-" * 60)
+    print(f"history page ({args.history} items) bytes   inline={len(inline) * args.history:>9} B   "
+          f"summary={len(summary) * args.history:>9} B")
+    print(f"history page decode             inline={t_inline * 1e3:8.3f} ms  summary={t_summary * 1e3:8.3f} ms")
+    print(f"open one analysis (decompress)  {t_open * 1e6:8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local ATS pre-scorer on one core.
+
+Usage: python benchmarks/bench_ats_scorer.py [--seconds 2]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from ats_scorer import score_resume  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time budget per resume")
+    args = parser.parse_args()
+
+    resumes = {path.name: path.read_text() for path in sorted(CORPUS_DIR.glob("*.txt"))}
+    if not resumes:
+        print(f"ERROR: no .txt resumes found in {CORPUS_DIR}")
+        return 1
+
+    print("=" * 60)
+    print("LOCAL ATS PRE-SCORER (single core)")
+    print("=" * 60)
+
+    total_runs = 0
+    total_time = 0.0
+    for name, text in resumes.items():
+        result = score_resume(text)  # warm-up
+        runs = 0
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        while time.perf_counter() < deadline:
+            for _ in range(100):
+                score_resume(text)
+            runs += 100
+        elapsed = time.perf_counter() - start
+        total_runs += runs
+        total_time += elapsed
+        print(
+            f"{name:<36} {len(text):>6} chars  score={result['overall_score']:>3}  "
+            f"{elapsed / runs * 1e6:8.1f} µs/resume  {runs / elapsed:10.0f} resumes/s"
+        )
+
+    print("-" * 60)
+    print(f"{'overall':<36} {total_time / total_runs * 1e6:23.1f} µs/resume  {total_runs / total_time:10.0f} resumes/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
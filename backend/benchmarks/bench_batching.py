@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Estimate tokens per resume and throughput for batched vs single analysis calls.
+
+Prompt sizes come from the real prompt builders on the corpus resumes;
+completion size comes from the recorded sample analysis. Tokens are
+estimated at ~4 characters per token. Throughput is the lower of the
+request and token rate limits.
+
+Usage: python benchmarks/bench_batching.py [--rpm 30] [--tpm 6000]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Placeholder settings; server.py validates them at import
+import _server_env  # noqa: E402,F401
+
+from server import build_analysis_prompt, build_batch_prompt  # noqa: E402
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+CHARS_PER_TOKEN = 4
+
+
+def tokens(text: str) -> float:
+    return len(text) / CHARS_PER_TOKEN
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rpm", type=int, default=30, help="requests per minute limit")
+    parser.add_argument("--tpm", type=int, default=6000, help="tokens per minute limit")
+    parser.add_argument("--max-batch", type=int, default=8)
+    args = parser.parse_args()
+
+    resumes = [path.read_text() for path in sorted(CORPUS_DIR.glob("*.txt"))]
+    completion = tokens(json.dumps(json.loads((CORPUS_DIR / "analysis_result.json").read_text())))
+
+    print("=" * 72)
+    print(f"BATCHED ANALYSIS (limits: {args.rpm} RPM, {args.tpm} TPM, ~{CHARS_PER_TOKEN} chars/token)")
+    print("=" * 72)
+    print(f"{'batch':>5}  {'prompt tok/resume':>18}  {'total tok/resume':>17}  {'resumes/min':>12}  {'vs single':>9}")
+
+    baseline = None
+    for size in range(1, args.max_batch + 1):
+        items = [(resumes[i % len(resumes)], "backend engineer") for i in range(size)]
+        if size == 1:
+            prompt = build_analysis_prompt(*items[0])
+        else:
+            prompt = build_batch_prompt(items)
+        prompt_per_resume = tokens(prompt) / size
+        per_request = tokens(prompt) + completion * size
+        requests_per_minute = min(args.rpm, args.tpm / per_request)
+        throughput = requests_per_minute * size
+        baseline = baseline or throughput
+        print(
+            f"{size:>5}  {prompt_per_resume:>18.0f}  {per_request / size:>17.0f}  "
+            f"{throughput:>12.2f}  {throughput / baseline:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
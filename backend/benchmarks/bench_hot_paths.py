@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Time the per-request pure-Python hot paths and fail on regressions.
+
+Cases are built from the checked-in corpus (resumes and PDFs) and the
+recorded Groq replies in cassettes/groq_outputs.json:
+
+  extract_json              every cassette reply, clean and malformed
+  validate_resume_content   every corpus resume
+  extract_pdf_text          every corpus PDF
+  build_*_prompt            full and section prompts per resume
+  serialize                 ResumeAnalysis -> summary + compressed detail
+  pipeline                  run_analysis + storage documents, with the Groq
+                            call replayed from the cassette (no network, no DB)
+
+Each case reports the best of --repeat timing runs. Regressions are judged
+on the case's cost relative to a fixed calibration loop timed alongside it,
+so a slower or busier machine does not by itself count as one. The script
+exits non-zero if any case is more than --threshold slower than its entry
+in baselines/hot_paths.json.
+
+Usage:
+    python benchmarks/bench_hot_paths.py [--threshold 0.3] [--filter pipeline]
+    python benchmarks/bench_hot_paths.py --update   (rewrite the baselines)
+"""
+import argparse
+import asyncio
+import gc
+import io
+import json
+import logging
+import platform
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Placeholder settings; server.py validates them at import
+import _server_env  # noqa: E402,F401
+
+import server  # noqa: E402
+from resume_sections import evaluable_sections  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+CORPUS_DIR = BENCH_DIR / "corpus"
+CASSETTE_PATH = BENCH_DIR / "cassettes" / "groq_outputs.json"
+BASELINE_PATH = BENCH_DIR / "baselines" / "hot_paths.json"
+TARGET_ROLE = "backend engineer"
+
+
+def load_cassette() -> dict[str, dict]:
+    cassette = json.loads(CASSETTE_PATH.read_text())
+    return {entry["name"]: entry for entry in cassette["entries"]}
+
+
+def check_cassette(entries: dict[str, dict]) -> list[str]:
+    """Every reply must parse (or fail to parse) the way the cassette says it does."""
+    problems = []
+    for name, entry in entries.items():
+        try:
+            server.extract_json(entry["content"])
+            outcome = "ok"
+        except ValueError:
+            outcome = "error"
+        if outcome != entry["expect"]:
+            problems.append(f"{name}: expected {entry['expect']}, got {outcome}")
+    return problems
+
+
+class Replay:
+    """Stands in for call_llm_json, answering every prompt with one recorded reply."""
+
+    def __init__(self, content: str):
+        self.content = content
+
+    async def __call__(self, prompt: str, validate=None, max_tokens: int = 2048, usage=None, ticket=None) -> dict:
+        result = server.extract_json(self.content)
+        if validate:
+            validate(result)
+        return result
+
+
+async def no_previous_results(user_id, role_target, hashes) -> dict:
+    return {}
+
+
+async def no_near_duplicate(user_id, role_target, fingerprint):
+    return None
+
+
+def build_cases(resumes: dict[str, str], pdfs: dict[str, bytes], entries: dict[str, dict]) -> dict:
+    cases = {}
+
+    for name, entry in entries.items():
+        if entry["expect"] == "ok":
+            cases[f"extract_json[{name}]"] = lambda content=entry["content"]: server.extract_json(content)
+        else:
+            def failing(content=entry["content"]):
+                try:
+                    server.extract_json(content)
+                except ValueError:
+                    pass
+            cases[f"extract_json[{name}]"] = failing
+
+    for name, text in resumes.items():
+        cases[f"validate_resume_content[{name}]"] = lambda text=text: server.validate_resume_content(text)
+
+    for name, data in pdfs.items():
+        cases[f"extract_pdf_text[{name}]"] = lambda data=data: server.extract_pdf_text(io.BytesIO(data))
+
+    for name, text in resumes.items():
+        cases[f"build_analysis_prompt[{name}]"] = (
+            lambda text=text: server.build_analysis_prompt(text, TARGET_ROLE)
+        )
+        sections = evaluable_sections(text[:server.MAX_RESUME_CHARS])
+        if len(sections) >= 2:
+            cases[f"build_section_prompt[{name}]"] = (
+                lambda sections=sections: server.build_section_prompt(sections, TARGET_ROLE)
+            )
+
+    stored = server.ResumeAnalysis(
+        user_id="bench-user",
+        resume_text=resumes["software_engineer.txt"][:500],
+        role_target=TARGET_ROLE,
+        prompt_version=server.FULL_PROMPT_VERSION,
+        analysis_result=server.extract_json(entries["analysis_clean"]["content"]),
+    )
+    cases["serialize[model_dump]"] = lambda: stored.model_dump(mode="json")
+    cases["serialize[summary+detail]"] = lambda: (
+        server.analysis_summary(stored), server.analysis_detail(stored)
+    )
+
+    loop = asyncio.new_event_loop()
+    replies = {
+        "sections": Replay(entries["sections_software_engineer"]["content"]),
+        "analysis": Replay(entries["analysis_clean"]["content"]),
+    }
+
+    def pipeline(text: str):
+        outcome = loop.run_until_complete(server.run_analysis("bench-user", text, TARGET_ROLE))
+        resume_analysis = server.ResumeAnalysis(
+            user_id="bench-user",
+            resume_text=text[:500],
+            role_target=TARGET_ROLE,
+            prompt_version=outcome.prompt_version,
+            analysis_result=outcome.analysis,
+            section_results=outcome.section_results,
+            resume_terms=server.term_frequencies(text),
+        )
+        return server.analysis_summary(resume_analysis), server.analysis_detail(resume_analysis)
+
+    for name, text in resumes.items():
+        sectioned = len(evaluable_sections(text[:server.MAX_RESUME_CHARS])) >= 2
+        reply = replies["sections" if sectioned else "analysis"]
+
+        def run(text=text, reply=reply):
+            server.call_llm_json = reply
+            return pipeline(text)
+        cases[f"pipeline[{name}]"] = run
+
+    pdf_text = server.extract_pdf_text(io.BytesIO(pdfs["software_engineer.pdf"]))
+
+    def pdf_pipeline():
+        text = server.extract_pdf_text(io.BytesIO(pdfs["software_engineer.pdf"]))
+        server.call_llm_json = replies["sections" if len(evaluable_sections(pdf_text)) >= 2 else "analysis"]
+        return pipeline(text)
+    cases["pipeline[software_engineer.pdf]"] = pdf_pipeline
+
+    return cases
+
+
+def loops_for(fn, min_run: float) -> int:
+    """Smallest power-of-two loop count that keeps `fn` busy for at least `min_run` seconds."""
+    fn()  # warm-up
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_run:
+            return loops
+        loops *= 2
+
+
+def per_call(fn, loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) / loops
+
+
+def calibration_workload():
+    words = [f"word{i}" for i in range(2000)]
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + len(word)
+    return sorted(counts.items(), key=lambda item: item[1])
+
+
+def measure(fn, repeat: int, min_run: float) -> tuple[float, float]:
+    """
+    Return (best µs per call, best cost relative to the calibration loop).
+
+    Each case run is paired with a calibration run right next to it, so a
+    busy or throttled machine slows both sides of the ratio alike.
+    """
+    gc.collect()  # start every case from a clean heap
+    loops = loops_for(fn, min_run)
+    calibration_loops = loops_for(calibration_workload, min_run / 2)
+    best_case = best_calibration = float("inf")
+    for _ in range(repeat):
+        best_calibration = min(best_calibration, per_call(calibration_workload, calibration_loops))
+        best_case = min(best_case, per_call(fn, loops))
+    return best_case * 1e6, best_case / best_calibration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="allowed relative slowdown over the baseline (0.3 = 30%%)")
+    parser.add_argument("--slack-us", type=float, default=2.0,
+                        help="ignore slowdowns smaller than this many µs (timer noise on tiny cases)")
+    parser.add_argument("--repeat", type=int, default=7, help="timing runs per case")
+    parser.add_argument("--min-run", type=float, default=0.05, help="minimum seconds per timing run")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this text")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baselines")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    server.find_previous_section_results = no_previous_results
+    server.find_near_duplicate = no_near_duplicate
+
+    entries = load_cassette()
+    problems = check_cassette(entries)
+    if problems:
+        print("ERROR: cassette replies no longer parse as recorded:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+
+    resumes = {path.name: path.read_text() for path in sorted(CORPUS_DIR.glob("*.txt"))}
+    pdfs = {path.name: path.read_bytes() for path in sorted(CORPUS_DIR.glob("*.pdf"))}
+    cases = {
+        name: fn for name, fn in build_cases(resumes, pdfs, entries).items() if args.filter in name
+    }
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    expected = baseline.get("cases", {})
+
+    print("=" * 90)
+    print(f"HOT PATHS  (python {platform.python_version()}, threshold +{args.threshold:.0%} "
+          f"relative to the calibration loop)")
+    print("=" * 90)
+    print(f"{'case':<56} {'µs/call':>10} {'baseline':>10} {'change':>8}")
+
+    results = {}
+    regressions = []
+    for name, fn in cases.items():
+        micros, relative = measure(fn, args.repeat, args.min_run)
+        results[name] = {"us": round(micros, 2), "relative": round(relative, 5)}
+        if args.update or name not in expected:
+            print(f"{name:<56} {micros:>10.1f} {'-':>10} {'' if args.update else 'new':>8}")
+            continue
+        change = relative / expected[name]["relative"] - 1
+        if change > args.threshold:
+            # Confirm before failing: one noisy run should not fail the suite
+            micros, relative = min((micros, relative), measure(fn, args.repeat, args.min_run), key=lambda m: m[1])
+            change = relative / expected[name]["relative"] - 1
+        flag = ""
+        if change > args.threshold and micros - expected[name]["us"] > args.slack_us:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<56} {micros:>10.1f} {expected[name]['us']:>10.1f} {change:>+8.0%}{flag}")
+
+    if args.update:
+        if args.filter:
+            results = {**expected, **results}
+        BASELINE_PATH.parent.mkdir(exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps({
+            "python": platform.python_version(),
+            "cases": results,
+        }, indent=2) + "\n")
+        print("-" * 90)
+        print(f"Baselines written to {BASELINE_PATH.relative_to(BACKEND_DIR)}")
+        return 0
+
+    print("-" * 90)
+    if regressions:
+        print(f"FAILED: {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    print("OK: no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Measure peak memory of PDF upload handling.
+
+1. One upload, parsed the old way (read() + BytesIO copy) vs. in place from
+   the spooled upload file.
+2. Concurrent oversized uploads streamed (chunked, no Content-Length) into
+   /api/analyze/pdf, showing they are cut off at MAX_UPLOAD_BYTES, and
+   non-PDF uploads, cut off as soon as the file part's first bytes arrive.
+
+Usage: python benchmarks/bench_uploads.py [--concurrency 16]
+"""
+import argparse
+import asyncio
+import io
+import sys
+import tracemalloc
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Placeholder settings; server.py validates them at import
+import _server_env  # noqa: E402,F401
+
+from pypdf import PdfReader  # noqa: E402
+from starlette.datastructures import UploadFile  # noqa: E402
+
+from make_pdf import make_pdf  # noqa: E402
+from server import (  # noqa: E402
+    MAX_UPLOAD_BYTES,
+    PDF_MAGIC,
+    UPLOAD_SPOOL_BYTES,
+    app,
+    extract_pdf_text,
+)
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+CHUNK = 64 * 1024
+
+
+def spooled_upload(data: bytes) -> UploadFile:
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    spool.write(data)
+    spool.seek(0)
+    return UploadFile(spool, size=len(data), filename="resume.pdf")
+
+
+async def legacy_parse(upload: UploadFile) -> str:
+    contents = await upload.read()
+    pdf = PdfReader(io.BytesIO(contents))
+    return "".join(page.extract_text() or "" for page in pdf.pages)
+
+
+async def streaming_parse(upload: UploadFile) -> str:
+    assert await upload.read(len(PDF_MAGIC)) == PDF_MAGIC
+    await upload.seek(0)
+    return extract_pdf_text(upload.file)
+
+
+async def peak_memory(coro_factory) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await coro_factory()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def single_uploads():
+    text = (CORPUS_DIR / "software_engineer.txt").read_text()
+    print(f"{'pdf size':>10}  {'read()+BytesIO':>16}  {'spooled in place':>17}")
+    for repeat in (1, 60, 300):
+        data = make_pdf(text, repeat)
+        legacy = await peak_memory(lambda: legacy_parse(spooled_upload(data)))
+        streaming = await peak_memory(lambda: streaming_parse(spooled_upload(data)))
+        print(f"{len(data) / 1024:8.0f} KiB  {legacy / 1024:12.0f} KiB  {streaming / 1024:13.0f} KiB")
+
+
+async def oversized_upload(size: int, magic: bytes = PDF_MAGIC) -> tuple[int, int]:
+    """Stream a multipart body of `size` bytes; return (status, bytes consumed by the app)."""
+    boundary = b"benchboundary"
+    head = (
+        b"--" + boundary + b"\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.pdf\"\r\n"
+        b"Content-Type: application/pdf\r\n\r\n" + magic
+    )
+    consumed = 0
+    sent = 0
+    status = 0
+
+    async def receive():
+        nonlocal consumed, sent
+        if sent == 0:
+            body = head
+        elif sent < size:
+            body = b"0" * min(CHUNK, size - sent)
+        else:
+            body = b"\r\n--" + boundary + b"--\r\n"
+        sent += len(body)
+        consumed += len(body)
+        return {"type": "http.request", "body": body, "more_body": sent <= size}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/analyze/pdf", "raw_path": b"/api/analyze/pdf",
+        "query_string": b"user_id=bench", "root_path": "", "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + boundary)],
+    }
+    await app(scope, receive, send)
+    return status, consumed
+
+
+async def concurrent_uploads(concurrency: int, size: int, magic: bytes = PDF_MAGIC):
+    results = []
+
+    async def run():
+        results.extend(await asyncio.gather(*(oversized_upload(size, magic) for _ in range(concurrency))))
+
+    peak = await peak_memory(run)
+    statuses = sorted({status for status, _ in results})
+    max_consumed = max(consumed for _, consumed in results)
+    kind = "PDF" if magic == PDF_MAGIC else "non-PDF"
+    print(f"{concurrency} x {size / 1024 / 1024:.0f} MiB chunked {kind} uploads -> status {statuses}")
+    print(f"max bytes read per upload  {max_consumed / 1024 / 1024:8.2f} MiB (limit {MAX_UPLOAD_BYTES / 1024 / 1024:.0f} MiB)")
+    print(f"peak traced memory         {peak / 1024 / 1024:8.2f} MiB total, "
+          f"{peak / concurrency / 1024 / 1024:.2f} MiB per upload (spool {UPLOAD_SPOOL_BYTES / 1024 / 1024:.0f} MiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--upload-mb", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("UPLOAD MEMORY")
+    print("=" * 60)
+    asyncio.run(single_uploads())
+    print("-" * 60)
+    asyncio.run(concurrent_uploads(args.concurrency, args.upload_mb * 1024 * 1024))
+    print("-" * 60)
+    asyncio.run(concurrent_uploads(args.concurrency, args.upload_mb * 1024 * 1024, magic=b"PK\x03\x04"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+import math
+import re
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+# -------------------------------------------------
+# TOKENIZING
+# -------------------------------------------------
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not of off on once only or other our ours out over own per
+same she should so some such than that the their theirs them then there these they this
+those through to too under until up very via was we were what when where which while who
+whom why will with within without would you your yours
+able across ability candidate candidates company experience work working role team teams
+years year strong good excellent plus preferred required requirements responsibilities
+including include includes using use used new looking join job must well etc
+""".split())
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Role keyword profiles; multi-word keywords are matched as n-grams.
+ROLE_PROFILES = {
+    "backend engineer": (
+        "python", "java", "golang", "node.js", "sql", "postgresql", "mysql", "mongodb", "redis",
+        "rest", "api", "microservices", "docker", "kubernetes", "aws", "kafka", "grpc",
+        "fastapi", "django", "spring", "ci/cd", "system design", "distributed systems",
+    ),
+    "frontend engineer": (
+        "javascript", "typescript", "react", "next.js", "vue", "angular", "html", "css",
+        "tailwind", "redux", "webpack", "jest", "accessibility", "responsive design",
+        "performance", "figma", "rest", "graphql",
+    ),
+    "full stack engineer": (
+        "javascript", "typescript", "react", "node.js", "express", "python", "sql",
+        "mongodb", "postgresql", "rest", "api", "docker", "aws", "html", "css", "git",
+        "ci/cd",
+    ),
+    "data analyst": (
+        "sql", "excel", "python", "pandas", "tableau", "power bi", "looker", "statistics",
+        "dashboards", "reporting", "a/b testing", "data visualization", "etl",
+        "data cleaning", "stakeholders", "kpis",
+    ),
+    "data scientist": (
+        "python", "sql", "pandas", "numpy", "scikit-learn", "statistics",
+        "machine learning", "deep learning", "regression", "classification",
+        "experimentation", "a/b testing", "feature engineering", "tensorflow", "pytorch",
+    ),
+    "machine learning engineer": (
+        "python", "pytorch", "tensorflow", "machine learning", "deep learning", "mlops",
+        "model deployment", "docker", "kubernetes", "aws", "spark", "feature engineering",
+        "nlp", "computer vision", "llm", "transformers",
+    ),
+    "devops engineer": (
+        "linux", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ansible",
+        "ci/cd", "jenkins", "github actions", "monitoring", "prometheus", "grafana",
+        "bash", "networking", "incident response",
+    ),
+    "mobile developer": (
+        "android", "ios", "kotlin", "swift", "java", "react native", "flutter", "dart",
+        "firebase", "rest", "api", "app store", "play store", "ui",
+    ),
+    "product manager": (
+        "roadmap", "stakeholders", "user research", "prioritization", "product strategy",
+        "metrics", "kpis", "a/b testing", "agile", "scrum", "jira", "analytics", "sql",
+        "go-to-market", "requirements", "figma",
+    ),
+    "qa engineer": (
+        "testing", "test automation", "selenium", "cypress", "playwright", "pytest",
+        "junit", "api testing", "regression testing", "test cases", "jira", "ci/cd",
+        "performance testing", "bug tracking",
+    ),
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens with stopwords removed; keeps c++, c#, node.js."""
+    return [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in STOPWORDS]
+
+
+def _ngram_words(text: str) -> list[str]:
+    return _TOKEN_RE.findall(re.sub(r"[/-]", " ", text.lower()))
+
+
+def keyword_terms(text: str) -> set[str]:
+    """Unigrams, bigrams and trigrams, for matching multi-word keywords."""
+    words = _ngram_words(text)
+    terms = set(words)
+    terms.update(" ".join(pair) for pair in zip(words, words[1:]))
+    terms.update(" ".join(triple) for triple in zip(words, words[1:], words[2:]))
+    return terms
+
+
+# -------------------------------------------------
+# ROLE KEYWORD INDEX (precomputed at import)
+# -------------------------------------------------
+ROLE_NAMES = list(ROLE_PROFILES)
+KEYWORD_VOCAB = sorted({kw for kws in ROLE_PROFILES.values() for kw in kws})
+# display keyword -> n-gram form produced by keyword_terms ("ci/cd" -> "ci cd")
+_KEYWORD_NGRAMS = {kw: " ".join(_ngram_words(kw)) for kw in KEYWORD_VOCAB}
+_KEYWORD_IDS = {_KEYWORD_NGRAMS[kw]: i for i, kw in enumerate(KEYWORD_VOCAB)}
+
+# roles x keywords: K @ x counts each role's keywords present in the text,
+# and the row-normalised M @ x is the fraction of each profile covered
+_ROLE_KEYWORDS = np.zeros((len(ROLE_NAMES), len(KEYWORD_VOCAB)), dtype=np.float32)
+for _row, _role in enumerate(ROLE_NAMES):
+    for _kw in ROLE_PROFILES[_role]:
+        _ROLE_KEYWORDS[_row, _KEYWORD_IDS[_KEYWORD_NGRAMS[_kw]]] = 1.0
+_ROLE_MATRIX = _ROLE_KEYWORDS / _ROLE_KEYWORDS.sum(axis=1, keepdims=True)
+
+
+def _has_keyword(keyword: str, terms: set[str]) -> bool:
+    return _KEYWORD_NGRAMS.get(keyword, keyword) in terms
+
+
+def keyword_vector(terms: set[str]) -> np.ndarray:
+    vec = np.zeros(len(KEYWORD_VOCAB), dtype=np.float32)
+    ids = [_KEYWORD_IDS[t] for t in terms if t in _KEYWORD_IDS]
+    vec[ids] = 1.0
+    return vec
+
+
+def resolve_role(role_target: Optional[str], job_description: str) -> Optional[str]:
+    """
+    Pick the role profile named by role_target, else the first role title
+    written in the JD, else the role with the most keywords in the JD.
+    None if the JD names no role and mentions none of their keywords.
+    """
+    if role_target:
+        target = role_target.lower()
+        for role in ROLE_NAMES:
+            if role in target or target in role:
+                return role
+
+    text = f" {' '.join(_ngram_words(job_description))} "
+    named = {role: text.find(f" {role} ") for role in ROLE_NAMES}
+    named = {role: position for role, position in named.items() if position >= 0}
+    if named:
+        return min(named, key=named.get)
+
+    counts = _ROLE_KEYWORDS @ keyword_vector(keyword_terms(job_description))
+    if not counts.any():
+        return None
+    return ROLE_NAMES[int(np.argmax(counts))]
+
+
+def role_coverage(terms: set[str]) -> dict[str, float]:
+    """Fraction of every role profile's keywords present in the text."""
+    scores = _ROLE_MATRIX @ keyword_vector(terms)
+    return {role: round(float(score), 3) for role, score in zip(ROLE_NAMES, scores)}
+
+
+def jd_keywords(job_description: str, role: Optional[str], top_n: int = 15) -> list[str]:
+    """Known skill keywords in the JD, then its most repeated other terms; the role's profile if neither."""
+    terms = keyword_terms(job_description)
+    keywords = [kw for kw in KEYWORD_VOCAB if _has_keyword(kw, terms)]
+    frequent = [
+        tok for tok, count in Counter(tokenize(job_description)).most_common()
+        if count >= 2 and tok not in keywords and not tok.isdigit() and len(tok) > 2
+    ]
+    keywords.extend(frequent[:max(0, top_n - len(keywords))])
+    if not keywords and role:
+        keywords = list(ROLE_PROFILES[role])
+    return keywords
+
+
+# -------------------------------------------------
+# RESUME INDEX (BM25 over stored resumes)
+# -------------------------------------------------
+class ResumeIndex:
+    """
+    Memory-resident term index over stored resumes, one entry per key
+    (the latest resume for each user). Postings are kept in flat NumPy
+    arrays sorted by term so a query costs one slice per query term and
+    a single bincount over all matching documents.
+    """
+
+    def __init__(self):
+        self.vocab: dict[str, int] = {}
+        self.docs: dict[str, tuple[dict, np.ndarray, np.ndarray]] = {}
+        self._dirty = True
+        self._keys: list[str] = []
+        self._metas: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, key: str, terms: dict[str, int], meta: Optional[dict] = None):
+        """Insert or replace a document given its term frequencies."""
+        ids = np.fromiter(
+            (self.vocab.setdefault(term, len(self.vocab)) for term in terms),
+            dtype=np.int32, count=len(terms),
+        )
+        tfs = np.fromiter(terms.values(), dtype=np.float32, count=len(terms))
+        self.docs[key] = (meta or {}, ids, tfs)
+        self._dirty = True
+
+    def _build(self):
+        self._keys = list(self.docs)
+        self._metas = [self.docs[key][0] for key in self._keys]
+        n_docs = len(self._keys)
+        ids = [self.docs[key][1] for key in self._keys]
+        tfs = [self.docs[key][2] for key in self._keys]
+
+        lengths = np.array([tf.sum() for tf in tfs], dtype=np.float32)
+        self._doc_len = lengths
+        self._avg_len = float(lengths.mean()) if n_docs else 0.0
+
+        term_ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int32)
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int32), [len(i) for i in ids])
+        term_tfs = np.concatenate(tfs) if tfs else np.zeros(0, dtype=np.float32)
+
+        order = np.argsort(term_ids, kind="stable")
+        self._post_terms = term_ids[order]
+        self._post_docs = doc_ids[order]
+        self._post_tfs = term_tfs[order]
+
+        df = np.bincount(term_ids, minlength=len(self.vocab)).astype(np.float32)
+        self._df = df
+        self._idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._dirty = False
+
+    @property
+    def avg_len(self) -> float:
+        if self._dirty:
+            self._build()
+        return self._avg_len
+
+    def idf(self, term: str) -> float:
+        """BM25 idf of a term; unseen terms get the maximum idf."""
+        if self._dirty:
+            self._build()
+        term_id = self.vocab.get(term)
+        n_docs = len(self._keys)
+        if term_id is None or term_id >= len(self._idf):
+            return math.log(1.0 + (n_docs + 0.5) / 0.5)
+        return float(self._idf[term_id])
+
+    def score(self, query_terms: dict[str, int]) -> np.ndarray:
+        """BM25 score of every indexed document for the query."""
+        if self._dirty:
+            self._build()
+        n_docs = len(self._keys)
+        if not n_docs:
+            return np.zeros(0, dtype=np.float32)
+
+        query_ids = np.array(
+            [self.vocab[t] for t in query_terms if t in self.vocab], dtype=np.int32
+        )
+        if not len(query_ids):
+            return np.zeros(n_docs, dtype=np.float32)
+        query_weights = np.array(
+            [query_terms[t] for t in query_terms if t in self.vocab], dtype=np.float32
+        )
+
+        starts = np.searchsorted(self._post_terms, query_ids, side="left")
+        ends = np.searchsorted(self._post_terms, query_ids, side="right")
+        spans = ends - starts
+        if not spans.sum():
+            return np.zeros(n_docs, dtype=np.float32)
+
+        # Gather all postings of all query terms in one shot
+        positions = np.repeat(ends - spans.cumsum(), spans) + np.arange(spans.sum())
+        docs = self._post_docs[positions]
+        tfs = self._post_tfs[positions]
+        weights = np.repeat(self._idf[query_ids] * query_weights, spans)
+
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._doc_len[docs] / self._avg_len)
+        contrib = weights * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+        return np.bincount(docs, weights=contrib, minlength=n_docs).astype(np.float32)
+
+    def rank(self, query_terms: dict[str, int], limit: int = 20) -> list[dict]:
+        scores = self.score(query_terms)
+        if not len(scores):
+            return []
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {**self._metas[i], "score": round(float(scores[i]), 4)}
+            for i in top
+            if scores[i] > 0
+        ]
+
+
+def term_frequencies(text: str) -> dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+
+# -------------------------------------------------
+# RESUME VS JOB DESCRIPTION
+# -------------------------------------------------
+def tfidf_cosine(a: dict[str, int], b: dict[str, int], index: ResumeIndex) -> float:
+    """Cosine similarity of two term-frequency dicts weighted by corpus idf."""
+    terms = list(a.keys() | b.keys())
+    if not terms:
+        return 0.0
+    idf = np.array([index.idf(t) for t in terms], dtype=np.float32)
+    va = np.array([a.get(t, 0) for t in terms], dtype=np.float32) * idf
+    vb = np.array([b.get(t, 0) for t in terms], dtype=np.float32) * idf
+    denom = float(np.linalg.norm(va) * np.linalg.norm(vb))
+    return float(va @ vb) / denom if denom else 0.0
+
+
+def match_resume(resume_text: str, job_description: str, role_target: Optional[str], index: ResumeIndex) -> dict:
+    """Keyword coverage and lexical similarity of one resume against one JD."""
+    resume_terms = keyword_terms(resume_text)
+    role = resolve_role(role_target, job_description)
+
+    keywords = jd_keywords(job_description, role)
+    matched = [kw for kw in keywords if _has_keyword(kw, resume_terms)]
+    missing = [kw for kw in keywords if not _has_keyword(kw, resume_terms)]
+
+    resume_tf = term_frequencies(resume_text)
+    jd_tf = term_frequencies(job_description)
+
+    # BM25 of the JD against this resume alone, using corpus statistics
+    resume_len = sum(resume_tf.values())
+    avg_len = index.avg_len or resume_len or 1
+    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * resume_len / avg_len)
+    bm25 = sum(
+        index.idf(term) * qtf * resume_tf[term] * (BM25_K1 + 1.0) / (resume_tf[term] + norm)
+        for term, qtf in jd_tf.items()
+        if term in resume_tf
+    )
+
+    return {
+        "role_profile": role,
+        "keyword_coverage": round(len(matched) / len(keywords), 3) if keywords else 0.0,
+        "matched_keywords": matched,
+        "missing_keywords": missing,
+        "tfidf_similarity": round(tfidf_cosine(resume_tf, jd_tf, index), 4),
+        "bm25_score": round(bm25, 4),
+        "role_fit": role_coverage(resume_terms),
+    }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Rebuild `analytics_rollups` and `user_score_rollups` from the analyses collection.
+
+Scans every analysis summary once, accumulates the same increments that
+record_rollups() applies at write time, and overwrites the rollup documents
+with the totals. Run it once after deploying rollups, or any time the
+rollups need to be rebuilt; it is safe to re-run. Analyses stored while it
+runs may be counted twice or missed, so run it during a quiet period.
+
+Usage (from backend/):
+    python migrations/backfill_analytics_rollups.py [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo import ReplaceOne
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from server import client, db, rollup_increments  # noqa: E402
+
+PROJECTION = {
+    "_id": 0, "user_id": 1, "role_target": 1, "overall_score": 1, "provisional": 1,
+    "llm_usage": 1, "created_at": 1, "analysis_result.overall_score": 1, "analysis_result.provisional": 1,
+}
+
+
+def add(totals: dict, increments: dict):
+    for field, value in increments.items():
+        if field.startswith("histogram."):
+            histogram = totals.setdefault("histogram", {})
+            label = field.split(".", 1)[1]
+            histogram[label] = histogram.get(label, 0) + value
+        else:
+            totals[field] = totals.get(field, 0) + value
+
+
+async def backfill(dry_run: bool, batch_size: int):
+    buckets: dict[tuple[str, str], dict] = {}
+    users: dict[str, dict] = {}
+    scanned = 0
+
+    async for doc in db.analyses.find({}, PROJECTION).batch_size(batch_size):
+        legacy = doc.pop("analysis_result", None) or {}
+        doc.setdefault("overall_score", legacy.get("overall_score"))
+        doc.setdefault("provisional", legacy.get("provisional", False))
+
+        key, bucket_inc, user_inc = rollup_increments(doc)
+        add(buckets.setdefault((key["day"], key["role"]), {}), bucket_inc)
+        add(users.setdefault(doc["user_id"], {}), user_inc)
+        scanned += 1
+
+    print(f"Scanned {scanned} analyses -> {len(buckets)} day/role buckets, {len(users)} users")
+    if dry_run:
+        return
+
+    bucket_ops = [
+        ReplaceOne({"day": day, "role": role}, {"day": day, "role": role, **totals}, upsert=True)
+        for (day, role), totals in buckets.items()
+    ]
+    user_ops = [
+        ReplaceOne({"user_id": user_id}, {"user_id": user_id, **totals}, upsert=True)
+        for user_id, totals in users.items()
+    ]
+    for i in range(0, len(bucket_ops), batch_size):
+        await db.analytics_rollups.bulk_write(bucket_ops[i:i + batch_size], ordered=False)
+    for i in range(0, len(user_ops), batch_size):
+        await db.user_score_rollups.bulk_write(user_ops[i:i + batch_size], ordered=False)
+
+    # Buckets with no remaining analyses would otherwise keep stale totals
+    stale = [
+        rollup["_id"]
+        async for rollup in db.analytics_rollups.find({}, {"_id": 1, "day": 1, "role": 1})
+        if (rollup["day"], rollup["role"]) not in buckets
+    ]
+    if stale:
+        await db.analytics_rollups.delete_many({"_id": {"$in": stale}})
+    await db.user_score_rollups.delete_many({"user_id": {"$nin": list(users)}})
+    print("Rollups rebuilt")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild analytics rollups from analyses")
+    parser.add_argument("--dry-run", action="store_true", help="scan and report without writing")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    await backfill(args.dry_run, args.batch_size)
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
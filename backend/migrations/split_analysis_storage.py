@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Move inline `analyses` documents to the summary + compressed detail layout.
+
+Each legacy document keeps its `id` and becomes a small summary document in
+`analyses`; its full result is written to `analysis_details`. The migration
+is idempotent and can be re-run safely.
+
+Usage (from backend/):
+    python migrations/split_analysis_storage.py --dry-run
+    python migrations/split_analysis_storage.py --measure
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from server import (  # noqa: E402
+    DETAIL_FIELDS,
+    ResumeAnalysis,
+    analysis_detail,
+    analysis_summary,
+    client,
+    db,
+)
+from job_matcher import term_frequencies  # noqa: E402
+
+LEGACY_QUERY = {"analysis_result": {"$exists": True}}
+
+
+async def collection_sizes() -> dict:
+    sizes = {}
+    for name in ("analyses", "analysis_details"):
+        try:
+            stats = await db.command("collStats", name)
+        except Exception:
+            stats = {}
+        sizes[name] = {
+            "count": stats.get("count", 0),
+            "size": stats.get("size", 0),
+            "storage_size": stats.get("storageSize", 0),
+            "avg_obj_size": stats.get("avgObjSize", 0),
+        }
+    return sizes
+
+
+async def history_latency(sample_users: list[str], rounds: int = 5) -> float:
+    """Median milliseconds for the /api/analyses/{user_id} query."""
+    projection = {"_id": 0, "section_hashes": 0, "resume_terms": 0, **{field: 0 for field in DETAIL_FIELDS}}
+    timings = []
+    for _ in range(rounds):
+        for user_id in sample_users:
+            start = time.perf_counter()
+            await db.analyses.find({"user_id": user_id}, projection, sort=[("created_at", 1)]).to_list(None)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings) if timings else 0.0
+
+
+def print_measurement(label: str, sizes: dict, latency_ms: float):
+    print(f"\n{label}")
+    print("-" * 60)
+    for name, stats in sizes.items():
+        print(
+            f"{name:<18} docs={stats['count']:<8} size={stats['size'] / 1024:10.1f} KiB  "
+            f"storage={stats['storage_size'] / 1024:10.1f} KiB  avg={stats['avg_obj_size']:8.0f} B"
+        )
+    print(f"history query (median) {latency_ms:.2f} ms")
+
+
+async def migrate(dry_run: bool, batch_size: int) -> int:
+    migrated = 0
+    cursor = db.analyses.find(LEGACY_QUERY).batch_size(batch_size)
+    async for doc in cursor:
+        legacy_id = doc.pop("_id")
+        doc.setdefault("resume_text", "")
+        resume_analysis = ResumeAnalysis(**doc)
+        if not resume_analysis.resume_terms:
+            # Only the 500-char preview survives for old documents
+            resume_analysis.resume_terms = term_frequencies(resume_analysis.resume_text)
+
+        migrated += 1
+        if dry_run:
+            continue
+
+        await db.analysis_details.replace_one(
+            {"id": resume_analysis.id}, analysis_detail(resume_analysis), upsert=True
+        )
+        await db.analyses.replace_one({"_id": legacy_id}, analysis_summary(resume_analysis))
+
+        if migrated % batch_size == 0:
+            print(f"  migrated {migrated} documents...")
+    return migrated
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Split analyses into summary + compressed detail documents")
+    parser.add_argument("--dry-run", action="store_true", help="count legacy documents without writing")
+    parser.add_argument("--measure", action="store_true", help="report storage size and history latency before/after")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sample-users", type=int, default=50)
+    args = parser.parse_args()
+
+    sample_users = []
+    if args.measure:
+        sample_users = await db.analyses.distinct("user_id")
+        sample_users = sample_users[:args.sample_users]
+        print_measurement("BEFORE", await collection_sizes(), await history_latency(sample_users))
+
+    pending = await db.analyses.count_documents(LEGACY_QUERY)
+    print(f"\nLegacy documents to migrate: {pending}")
+    migrated = await migrate(args.dry_run, args.batch_size)
+    print(f"{'Would migrate' if args.dry_run else 'Migrated'} {migrated} documents")
+
+    if args.measure and not args.dry_run:
+        print_measurement("AFTER", await collection_sizes(), await history_latency(sample_users))
+
+    client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,72 @@
+import re
+import zlib
+
+import numpy as np
+
+# -------------------------------------------------
+# MINHASH FINGERPRINTS
+# -------------------------------------------------
+# MinHash over 3-word shingles estimates the Jaccard similarity of two
+# resumes: a changed date, phone number or bullet keeps it around 0.85-0.95,
+# while different resumes share almost no shingles.
+SHINGLE_SIZE = 3
+MINHASH_PERMUTATIONS = 64
+
+# LSH: 16 bands of 4 rows. Two resumes share a bucket in at least one band
+# with probability 1 - (1 - J^4)^16: ~1.0 at J=0.8, ~0.64 at J=0.5, ~0 below 0.2.
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, applied elementwise to uint64 arrays."""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+# Fixed per-permutation seeds; fingerprints are stored, so these must never change
+_SEEDS = _mix64(np.arange(1, MINHASH_PERMUTATIONS + 1, dtype=np.uint64))
+
+
+def shingles(text: str) -> set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text: str) -> str:
+    """
+    MinHash signature of the text's shingles, as hex. Only the low 16 bits of
+    each minimum are kept (b-bit MinHash); chance collisions add ~1/65536.
+    """
+    features = shingles(text)
+    if not features:
+        return "ff" * 2 * MINHASH_PERMUTATIONS
+    checksums = np.fromiter(
+        (zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint64, count=len(features)
+    )
+    minimums = _mix64(checksums[:, None] ^ _SEEDS[None, :]).min(axis=0)
+    return (minimums & np.uint64(0xFFFF)).astype(">u2").tobytes().hex()
+
+
+def similarity(a: str, b: str) -> float:
+    """Estimated Jaccard similarity: the share of signature slots that agree."""
+    if len(a) != len(b):
+        return 0.0
+    left = np.frombuffer(bytes.fromhex(a), dtype=">u2")
+    right = np.frombuffer(bytes.fromhex(b), dtype=">u2")
+    return float((left == right).mean())
+
+
+def band_keys(signature: str) -> list[str]:
+    """LSH bucket keys ("<band>:<crc of its rows>") to index and look up a signature by."""
+    raw = bytes.fromhex(signature)
+    width = 2 * LSH_ROWS
+    return [
+        f"{band}:{zlib.crc32(raw[band * width:(band + 1) * width]):08x}"
+        for band in range(LSH_BANDS)
+    ]
@@ -0,0 +1,193 @@
+import hashlib
+import re
+from typing import Optional
+
+# -------------------------------------------------
+# SECTION SPLITTING
+# -------------------------------------------------
+# Canonical section name -> header spellings commonly found in resumes.
+SECTION_ALIASES = {
+    "summary": (
+        "summary", "professional summary", "career summary", "profile",
+        "professional profile", "objective", "career objective", "about me",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience",
+        "employment", "employment history", "work history", "internships",
+        "internship", "internship experience",
+    ),
+    "projects": (
+        "projects", "personal projects", "academic projects", "key projects",
+        "project experience", "selected projects",
+    ),
+    "skills": (
+        "skills", "technical skills", "key skills", "core competencies",
+        "technologies", "tools and technologies", "skills and tools",
+    ),
+    "education": (
+        "education", "academic background", "academic qualifications",
+        "educational qualifications", "qualifications",
+    ),
+    "other": (
+        "certifications", "certificates", "achievements", "awards",
+        "languages", "publications", "activities", "extracurricular activities",
+        "volunteering", "interests", "hobbies", "leadership",
+    ),
+}
+
+# Sections the LLM is asked to score; the preamble (name, contact details)
+# is kept out of evaluation so a changed phone number never costs a call.
+EVALUATED_SECTIONS = ("summary", "experience", "projects", "skills", "education", "other")
+
+# Relative weight of each section in the recomputed overall score.
+SECTION_WEIGHTS = {
+    "summary": 0.10,
+    "experience": 0.35,
+    "projects": 0.20,
+    "skills": 0.20,
+    "education": 0.10,
+    "other": 0.05,
+}
+
+_ALIAS_TO_SECTION = {
+    alias: section
+    for section, aliases in SECTION_ALIASES.items()
+    for alias in aliases
+}
+
+_HEADER_RE = re.compile(
+    r"^[\s\W]*("
+    + "|".join(sorted((re.escape(a) for a in _ALIAS_TO_SECTION), key=len, reverse=True))
+    + r")[\s:\-–—]*$",
+    re.IGNORECASE,
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def match_section_header(line: str) -> Optional[str]:
+    """Return the canonical section name if the line is a section header."""
+    if len(line) > 48:
+        return None
+    match = _HEADER_RE.match(line)
+    if not match:
+        return None
+    alias = _WHITESPACE_RE.sub(" ", match.group(1).lower())
+    return _ALIAS_TO_SECTION.get(alias)
+
+
+def split_resume_sections(text: str) -> dict[str, str]:
+    """
+    Split resume text into canonical sections.
+    Text before the first recognised header is returned as "header".
+    Repeated headers of the same kind (e.g. "Experience" and "Internships")
+    are merged in document order.
+    """
+    sections: dict[str, list[str]] = {}
+    current = "header"
+
+    for line in text.splitlines():
+        section = match_section_header(line.strip())
+        if section:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+
+    return {
+        name: "\n".join(lines).strip()
+        for name, lines in sections.items()
+        if "\n".join(lines).strip()
+    }
+
+
+def section_hash(section_text: str) -> str:
+    """Content hash of a section, insensitive to whitespace-only edits."""
+    normalized = _WHITESPACE_RE.sub(" ", section_text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def evaluable_sections(text: str) -> dict[str, str]:
+    """Sections that take part in section-level evaluation, in canonical order."""
+    sections = split_resume_sections(text)
+    return {name: sections[name] for name in EVALUATED_SECTIONS if name in sections}
+
+
+# -------------------------------------------------
+# SCORE COMBINATION
+# -------------------------------------------------
+def score_verdict(score: int) -> str:
+    """Verdict sentence matching the scoring calibration used in the prompt."""
+    if score >= 90:
+        return "Exceptional resume that is ready for interviews."
+    if score >= 80:
+        return "Very strong resume that needs only minor improvements."
+    if score >= 70:
+        return "Good, solid profile, but some clear gaps remain."
+    if score >= 60:
+        return "Average resume: the skills are there but the execution is weak."
+    if score >= 50:
+        return "Below average: limited impact and noticeable ATS issues."
+    return "Weak resume with low interview chances in its current form."
+
+
+def _interleave(lists: list[list], limit: int) -> list:
+    """Take items round-robin from each list so every section is represented."""
+    merged = []
+    for i in range(max((len(items) for items in lists), default=0)):
+        for items in lists:
+            if i < len(items) and items[i] not in merged:
+                merged.append(items[i])
+                if len(merged) >= limit:
+                    return merged
+    return merged
+
+
+def combine_section_results(section_results: dict[str, dict], limit: int = 5) -> dict:
+    """
+    Build a full analysis result from per-section results.
+    The overall score is the weighted mean of the section scores, and the
+    feedback lists favour the strongest sections for strengths and the
+    weakest sections for everything else.
+    """
+    scores = {}
+    for name, result in section_results.items():
+        try:
+            scores[name] = max(0, min(100, int(result.get("score", 0))))
+        except (TypeError, ValueError):
+            scores[name] = 0
+
+    total_weight = sum(SECTION_WEIGHTS.get(name, 0.05) for name in scores)
+    overall = round(
+        sum(score * SECTION_WEIGHTS.get(name, 0.05) for name, score in scores.items())
+        / total_weight
+    ) if total_weight else 0
+
+    best_first = sorted(scores, key=lambda name: scores[name], reverse=True)
+    worst_first = list(reversed(best_first))
+
+    def collect(key: str, order: list[str]) -> list:
+        return _interleave(
+            [list(section_results[name].get(key) or []) for name in order],
+            limit,
+        )
+
+    weakest = worst_first[0] if worst_first else None
+    weakest_issues = (section_results[weakest].get("weaknesses") or []) if weakest else []
+    if weakest and weakest_issues:
+        summary_insight = f"The {weakest} section is holding this resume back: {weakest_issues[0]}"
+    elif weakest:
+        summary_insight = f"The {weakest} section is the weakest part of this resume."
+    else:
+        summary_insight = ""
+
+    return {
+        "overall_score": overall,
+        "score_verdict": score_verdict(overall),
+        "summary_insight": summary_insight,
+        "strengths": collect("strengths", best_first),
+        "weaknesses": collect("weaknesses", worst_first),
+        "ats_issues": collect("ats_issues", worst_first),
+        "improved_bullets": collect("improved_bullets", worst_first),
+        "recommendations": collect("recommendations", worst_first),
+        "section_scores": {name: scores[name] for name in section_results},
+    }
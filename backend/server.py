@@ -1,8 +1,12 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Depends, Request, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+from brotli_asgi import BrotliMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
-from brevo_python import Configuration, ApiClient, TransactionalEmailsApi
+from pymongo import ReturnDocument
+from brevo_python import Configuration, ApiClient, TransactionalEmailsApi, AccountApi
 from brevo_python.rest import ApiException
 from brevo_python.models.send_smtp_email import SendSmtpEmail
 
@@ -12,18 +16,30 @@ import logging
 import asyncio
 import json
 import re
-import io
+import hashlib
+import time
+import zlib
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
 import uuid
 from datetime import datetime, timezone, timedelta
 import secrets
 import random
 import string
 from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+from bson import Binary
+
+from resume_sections import combine_section_results, evaluable_sections, section_hash
+from resume_fingerprint import band_keys, minhash, similarity
+from ats_scorer import score_resume
+from job_matcher import ResumeIndex, match_resume, term_frequencies
 
 from groq import Groq
+import httpx
 
 # -------------------------------------------------
 # ENV
@@ -40,8 +56,23 @@ if missing_vars:
 # -------------------------------------------------
 # DATABASE
 # -------------------------------------------------
+# Pool settings are only passed when set, so unset ones keep the driver defaults
+MONGO_POOL_OPTIONS = {
+    option: int(os.environ[var])
+    for var, option in {
+        "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+        "MONGO_MIN_POOL_SIZE": "minPoolSize",
+        "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+        "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+        "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    }.items()
+    if os.environ.get(var)
+}
+
 try:
-    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], **MONGO_POOL_OPTIONS)
     db = client[os.environ["DB_NAME"]]
 except Exception as e:
     raise ValueError(f"Failed to initialize database connection: {str(e)}")
@@ -51,8 +82,157 @@ except Exception as e:
 # -------------------------------------------------
 brevo_config = Configuration()
 brevo_config.api_key["api-key"] = os.environ["BREVO_API_KEY"]
+if os.environ.get("BREVO_POOL_SIZE"):
+    brevo_config.connection_pool_maxsize = int(os.environ["BREVO_POOL_SIZE"])
 brevo_api_client = ApiClient(brevo_config)
 
+# -------------------------------------------------
+# GROQ CLIENT
+# -------------------------------------------------
+# One client per process so completions reuse kept-alive TLS connections
+GROQ_TIMEOUT_SECONDS = float(os.environ.get("GROQ_TIMEOUT_SECONDS", "60"))
+GROQ_MAX_CONNECTIONS = int(os.environ.get("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_KEEPALIVE_SECONDS = float(os.environ.get("GROQ_KEEPALIVE_SECONDS", "60"))
+
+groq_client: Optional[Groq] = None
+
+
+def get_groq_client() -> Groq:
+    global groq_client
+    if groq_client is None:
+        groq_client = Groq(
+            api_key=os.environ["GROQ_API_KEY"],
+            http_client=httpx.Client(
+                timeout=GROQ_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=GROQ_MAX_CONNECTIONS,
+                    max_keepalive_connections=GROQ_MAX_CONNECTIONS,
+                    keepalive_expiry=GROQ_KEEPALIVE_SECONDS,
+                ),
+            ),
+        )
+    return groq_client
+
+# -------------------------------------------------
+# UPLOAD LIMITS
+# -------------------------------------------------
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+# Uploads larger than this are spooled to a temp file instead of memory
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+UPLOAD_LIMITED_PATHS = {"/api/analyze/pdf"}
+PDF_MAGIC = b"%PDF-"
+# How much of a multipart body is searched for the start of the file part
+UPLOAD_SNIFF_BYTES = 64 * 1024
+
+# Starlette reads the spool size from this class attribute, so it applies to
+# every multipart form in the process; /api/analyze/pdf is the only route
+# taking files, and the default (1 MiB) matches Starlette's own.
+MultiPartParser.max_file_size = UPLOAD_SPOOL_BYTES
+
+
+class UploadTooLargeError(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=413,
+            detail=f"File too large. Maximum upload size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.",
+        )
+
+
+class UnsupportedUploadError(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=415, detail="Only PDF files are supported")
+
+
+class PdfSniffer:
+    """
+    Watch a multipart body as it streams in and check that the first file
+    part starts with PDF_MAGIC, buffering no more than UPLOAD_SNIFF_BYTES.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.delimiter = b"--" + boundary
+        self.head = b""
+        self.verdict: Optional[bool] = None  # None until the file part's first bytes arrive
+
+    def feed(self, chunk: bytes) -> Optional[bool]:
+        if self.verdict is not None or len(self.head) >= UPLOAD_SNIFF_BYTES:
+            return self.verdict
+        self.head += chunk[:UPLOAD_SNIFF_BYTES - len(self.head)]
+
+        position = 0
+        while True:
+            start = self.head.find(self.delimiter, position)
+            headers_end = self.head.find(b"\r\n\r\n", start) if start >= 0 else -1
+            if headers_end < 0:
+                return None
+            content = headers_end + 4
+            if b"filename=" in self.head[start:headers_end].lower():
+                if len(self.head) < content + len(PDF_MAGIC):
+                    return None
+                self.verdict = self.head[content:content + len(PDF_MAGIC)] == PDF_MAGIC
+                self.head = b""
+                return self.verdict
+            position = content
+
+
+def multipart_boundary(headers: dict) -> Optional[bytes]:
+    content_type = headers.get(b"content-type", b"").decode("latin-1")
+    media_type, _, params = content_type.partition(";")
+    if media_type.strip().lower() != "multipart/form-data":
+        return None
+    for param in params.split(";"):
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return value.strip('"').encode("latin-1")
+    return None
+
+
+class UploadLimitMiddleware:
+    """
+    Enforce MAX_UPLOAD_BYTES on upload routes while the body streams in:
+    a too-large Content-Length is rejected before any body is read, and
+    chunked bodies are cut off as soon as the running total passes the limit.
+    A file part that doesn't start with the PDF magic bytes is rejected as
+    soon as its first bytes arrive, before the rest of it is spooled.
+    """
+
+    def __init__(self, app, max_bytes: int, paths: set[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            error = UploadTooLargeError()
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+        boundary = multipart_boundary(headers)
+        sniffer = PdfSniffer(boundary) if boundary else None
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                if received > self.max_bytes:
+                    raise UploadTooLargeError()
+                if sniffer and sniffer.feed(body) is False:
+                    raise UnsupportedUploadError()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
 # -------------------------------------------------
 # APP
 # -------------------------------------------------
@@ -62,6 +242,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Added before CORS so that 413 responses still get CORS headers
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES, paths=UPLOAD_LIMITED_PATHS)
+
+# Brotli for clients that accept it, gzip otherwise; small bodies are sent as-is
+app.add_middleware(BrotliMiddleware, quality=4, minimum_size=1000, gzip_fallback=True)
+
 # ✅ CORS MIDDLEWARE - MUST BE FIRST
 app.add_middleware(
     CORSMiddleware,
@@ -88,9 +274,35 @@ logger = logging.getLogger("resume-ai")
 # CONSTANTS
 # -------------------------------------------------
 FREE_TIER_LIMIT = 3
+# When set, the free tier is a budget of LLM tokens instead of FREE_TIER_LIMIT analyses
+FREE_TIER_TOKEN_BUDGET = int(os.environ.get("FREE_TIER_TOKEN_BUDGET", "0"))
 OTP_EXPIRY_SECONDS = int(os.environ.get("OTP_EXPIRY", "600"))  # 10 minutes default
 OTP_LENGTH = 6
 MAX_RESUME_CHARS = 12000  # token safety for gemini-1.0-pro
+# Short TTL keeps the per-process cache close enough to other workers' writes
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL", "5"))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", "10000"))
+LLM_CIRCUIT_THRESHOLD = int(os.environ.get("LLM_CIRCUIT_THRESHOLD", "3"))  # failed analyses before opening
+LLM_CIRCUIT_COOLDOWN_SECONDS = int(os.environ.get("LLM_CIRCUIT_COOLDOWN", "60"))
+MAX_JOB_DESCRIPTION_CHARS = 8000
+
+# Stored on every analysis so results can be traced back to the prompt that produced them
+FULL_PROMPT_VERSION = "full-v1"
+SECTION_PROMPT_VERSION = "sections-v1"
+LOCAL_SCORER_VERSION = "ats-rules-v1"
+
+# Bulk scoring: short resumes are grouped into one completion
+BATCH_MAX_ITEMS = int(os.environ.get("LLM_BATCH_MAX_ITEMS", "4"))
+BATCH_MAX_WAIT_MS = int(os.environ.get("LLM_BATCH_MAX_WAIT_MS", "250"))
+BATCH_MAX_RESUME_CHARS = 4000  # longer resumes always get their own call
+BATCH_MAX_TOKENS_PER_RESUME = 1200
+BULK_MAX_RESUMES = 50
+
+# Near-duplicate resubmissions re-use the earlier analysis: sectioned resumes
+# keep its results for unchanged sections, others are served it whole. The
+# threshold is estimated shingle Jaccard similarity; 0 turns the lookup off.
+NEAR_DUPLICATE_SIMILARITY = float(os.environ.get("NEAR_DUPLICATE_SIMILARITY", "0.8"))
+NEAR_DUPLICATE_CANDIDATES = 20
 
 # -------------------------------------------------
 # MODELS
@@ -99,19 +311,59 @@ class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     email: EmailStr
     usage_count: int = 0
+    tokens_used: int = 0
+    tier: str = "free"  # LLM scheduling tier: "free" or "paid"
     otp_code: Optional[str] = None
     otp_expiry: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class LLMUsage(BaseModel):
+    """Token, attempt and latency totals for the LLM calls behind one analysis."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    attempts: int = 0
+    latency_ms: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add_response(self, response):
+        tokens = getattr(response, "usage", None)
+        if tokens:
+            self.prompt_tokens += tokens.prompt_tokens or 0
+            self.completion_tokens += tokens.completion_tokens or 0
+
+
 class ResumeAnalysis(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     resume_text: str
+    role_target: Optional[str] = None
+    prompt_version: Optional[str] = None
     analysis_result: dict
+    # [{"name": ..., "hash": ..., "result": {...}}] used for incremental re-analysis
+    section_results: list[dict] = Field(default_factory=list)
+    # term frequencies of the full resume, loaded into the job-matching index
+    resume_terms: dict[str, int] = Field(default_factory=dict)
+    # MinHash signature of the full resume, used to find near-duplicate resubmissions
+    fingerprint: Optional[str] = None
+    reused_from: Optional[str] = None  # near-duplicate analysis this one was served from
+    llm_usage: LLMUsage = Field(default_factory=LLMUsage)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class AnalysisOutcome(BaseModel):
+    analysis: dict
+    prompt_version: str
+    section_results: list[dict] = Field(default_factory=list)
+    sections_reused: int = 0
+    provisional: bool = False
+    fingerprint: Optional[str] = None
+    reused_from: Optional[str] = None  # id of the near-duplicate analysis served instead
+
+
 class OtpRequest(BaseModel):
     email: EmailStr
 
@@ -126,6 +378,21 @@ class ResumeTextRequest(BaseModel):
     role_target: Optional[str] = None
 
 
+class MatchRequest(BaseModel):
+    resume_text: str
+    job_description: str
+    role_target: Optional[str] = None
+
+
+class BulkAnalyzeRequest(BaseModel):
+    resumes: list[ResumeTextRequest] = Field(min_length=1, max_length=BULK_MAX_RESUMES)
+
+
+class RankRequest(BaseModel):
+    job_description: str
+    limit: int = Field(default=20, ge=1, le=500)
+
+
 # -------------------------------------------------
 # HELPERS
 # -------------------------------------------------
@@ -174,14 +441,96 @@ async def send_otp_email(email: str, otp_code: str) -> bool:
         return False
 
 
+def require_admin(x_admin_key: str = Header(default="")):
+    """Dependency guarding admin/recruiter endpoints with the ADMIN_API_KEY header."""
+    admin_key = os.environ.get("ADMIN_API_KEY")
+    if not admin_key or not secrets.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+def weak_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
 async def get_user_by_email(email: str):
     return await db.users.find_one({"email": email}, {"_id": 0})
 
 
+class TTLCache:
+    """Small LRU cache whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return dict(value)
+
+    def set(self, key: str, value: dict):
+        if self.ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, dict(value))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: str):
+        self._data.pop(key, None)
+
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
+
+
 async def get_user_by_id(user_id: str):
-    user = await db.users.find_one({"id": user_id})
-    if user and "_id" in user:
-        user["_id"] = str(user["_id"])
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    if user:
+        user_cache.set(user_id, user)
+    return user
+
+
+def quota_exhausted(user: dict) -> bool:
+    if FREE_TIER_TOKEN_BUDGET:
+        return user.get("tokens_used", 0) >= FREE_TIER_TOKEN_BUDGET
+    return user.get("usage_count", 0) >= FREE_TIER_LIMIT
+
+
+async def increment_usage(user_id: str, tokens: int = 0) -> Optional[dict]:
+    """Count one analysis and its tokens, and write the updated user through to the cache."""
+    user = await db.users.find_one_and_update(
+        {"id": user_id},
+        {"$inc": {"usage_count": 1, "tokens_used": tokens}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    if user:
+        user_cache.set(user_id, user)
     return user
 
 
@@ -215,6 +564,12 @@ def extract_json(text: str) -> dict:
             raise ValueError(f"Could not parse JSON: {str(e)}")
 
 
+def extract_pdf_text(stream) -> str:
+    """Extract text from a seekable PDF file object without copying it."""
+    pdf = PdfReader(stream)
+    return "".join(page.extract_text() or "" for page in pdf.pages)
+
+
 def validate_resume_content(text: str) -> tuple[bool, str]:
     """
     Validate if the uploaded text is actually a resume.
@@ -253,37 +608,288 @@ def validate_resume_content(text: str) -> tuple[bool, str]:
     return True, "Valid resume"
 
 
+# -------------------------------------------------
+# LLM CIRCUIT BREAKER
+# -------------------------------------------------
+class LLMUnavailableError(HTTPException):
+    """Groq could not produce a result: retries exhausted or the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls until
+    `cooldown` seconds have passed; the next call after that is a trial.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return False
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+            logger.warning(f"[AI] Circuit open for {self.cooldown}s after {self.failures} failures")
+
+
+llm_circuit = CircuitBreaker(LLM_CIRCUIT_THRESHOLD, LLM_CIRCUIT_COOLDOWN_SECONDS)
+
+
+# -------------------------------------------------
+# LLM SCHEDULER
+# -------------------------------------------------
+# Groq concurrency is one pool shared by every caller. Requests queue per
+# tier and each free slot goes to the waiting tier with the least weighted
+# service so far, so a burst in one tier can't starve the others.
+TIER_FREE = "free"
+TIER_PAID = "paid"
+TIER_INTERNAL = "internal"  # admin bulk scoring
+
+
+def tier_setting(var: str, default: str) -> dict[str, float]:
+    """Read a per-tier setting written as "paid=4,free=2,internal=1"; unset tiers keep the default."""
+    values = dict(item.split("=", 1) for item in default.split(","))
+    for item in filter(None, os.environ.get(var, "").split(",")):
+        tier, _, value = item.partition("=")
+        if tier.strip() in values and value.strip():
+            values[tier.strip()] = value.strip()
+    return {tier: float(value) for tier, value in values.items()}
+
+
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIER_WEIGHTS = tier_setting("LLM_TIER_WEIGHTS", "paid=4,free=2,internal=1")
+LLM_QUEUE_DEPTHS = {
+    tier: int(depth) for tier, depth in tier_setting("LLM_QUEUE_DEPTHS", "paid=200,free=100,internal=500").items()
+}
+# How long a caller of each tier is expected to wait before giving up (seconds)
+LLM_QUEUE_TIMEOUTS = tier_setting("LLM_QUEUE_TIMEOUTS", "paid=60,free=30,internal=300")
+DISCONNECT_POLL_SECONDS = 1.0
+QUEUE_WAIT_SAMPLES = 500  # recent waits kept per tier for percentiles
+
+
+class LLMQueueError(HTTPException):
+    """No Groq slot for this request: its tier's queue is full or its caller gave up waiting."""
+
+
+class QueueTicket:
+    """A caller's tier, and the point after which its answer is no longer wanted."""
+
+    def __init__(self, tier: str, is_disconnected=None):
+        self.tier = tier if tier in LLM_TIER_WEIGHTS else TIER_FREE
+        self.deadline = time.monotonic() + LLM_QUEUE_TIMEOUTS[self.tier]
+        self.is_disconnected = is_disconnected  # e.g. Request.is_disconnected
+
+    async def abandoned(self) -> bool:
+        if time.monotonic() >= self.deadline:
+            return True
+        return bool(self.is_disconnected and await self.is_disconnected())
+
+
+class LLMScheduler:
+    """
+    Weighted fair queuing of `max_concurrency` slots across tiers (stride
+    scheduling). A tier that was idle rejoins at the current virtual time,
+    so it can't bank credit and then monopolise the slots.
+    """
+
+    def __init__(self, max_concurrency: int, weights: dict[str, float], depths: dict[str, int]):
+        self.max_concurrency = max_concurrency
+        self.weights = weights
+        self.depths = depths
+        self.active = 0
+        self.virtual_time = 0.0
+        self.queues: dict[str, deque] = {tier: deque() for tier in weights}
+        self.passes = {tier: 0.0 for tier in weights}
+        self.stats = {
+            tier: {"granted": 0, "expired": 0, "rejected": 0, "waits_ms": deque(maxlen=QUEUE_WAIT_SAMPLES)}
+            for tier in weights
+        }
+
+    def _grant(self, tier: str, enqueued_at: float):
+        self.active += 1
+        # Uncontended grants skip the queue, so clamp here too: a stale pass
+        # would otherwise drag virtual time back and starve the other tiers
+        self.passes[tier] = max(self.passes[tier], self.virtual_time)
+        self.virtual_time = self.passes[tier]
+        self.passes[tier] += 1 / self.weights[tier]
+        self.stats[tier]["granted"] += 1
+        self.stats[tier]["waits_ms"].append((time.monotonic() - enqueued_at) * 1000)
+
+    def _dispatch(self):
+        while self.active < self.max_concurrency:
+            waiting = [tier for tier, queue in self.queues.items() if queue]
+            if not waiting:
+                return
+            tier = min(waiting, key=self.passes.__getitem__)
+            future, ticket, enqueued_at = self.queues[tier].popleft()
+            if future.done():
+                continue
+            if time.monotonic() >= ticket.deadline:
+                self.stats[tier]["expired"] += 1
+                future.set_exception(LLMQueueError(status_code=503, detail="AI service busy, please try again"))
+                continue
+            self._grant(tier, enqueued_at)
+            future.set_result(None)
+
+    async def acquire(self, ticket: QueueTicket):
+        tier = ticket.tier
+        if self.active < self.max_concurrency and not any(self.queues.values()):
+            self._grant(tier, time.monotonic())
+            return
+
+        queue = self.queues[tier]
+        if len(queue) >= self.depths[tier]:
+            self.stats[tier]["rejected"] += 1
+            raise LLMQueueError(status_code=429, detail="Too many analyses queued, please try again shortly")
+        if not queue:
+            self.passes[tier] = max(self.passes[tier], self.virtual_time)
+
+        entry = (asyncio.get_running_loop().create_future(), ticket, time.monotonic())
+        future = entry[0]
+        queue.append(entry)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), DISCONNECT_POLL_SECONDS)
+                    return
+                except asyncio.TimeoutError:
+                    if await ticket.abandoned():
+                        self.stats[tier]["expired"] += 1
+                        raise LLMQueueError(status_code=503, detail="AI service busy, please try again")
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()  # granted just as the caller gave up
+            else:
+                future.cancel()
+                if entry in queue:
+                    queue.remove(entry)
+            raise
+
+    def release(self):
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, ticket: QueueTicket):
+        await self.acquire(ticket)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> dict:
+        tiers = {}
+        for tier, stats in self.stats.items():
+            waits = sorted(stats["waits_ms"])
+            tiers[tier] = {
+                "weight": self.weights[tier],
+                "queued": len(self.queues[tier]),
+                "max_queued": self.depths[tier],
+                "granted": stats["granted"],
+                "expired": stats["expired"],
+                "rejected": stats["rejected"],
+                "wait_ms": {
+                    "p50": round(waits[len(waits) // 2], 1) if waits else None,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else None,
+                    "max": round(waits[-1], 1) if waits else None,
+                },
+            }
+        return {"max_concurrency": self.max_concurrency, "active": self.active, "tiers": tiers}
+
+
+llm_scheduler = LLMScheduler(LLM_MAX_CONCURRENCY, LLM_TIER_WEIGHTS, LLM_QUEUE_DEPTHS)
+
+
+def user_tier(user: dict) -> str:
+    return TIER_PAID if user.get("tier") == TIER_PAID else TIER_FREE
+
+
 # -------------------------------------------------
 # AI ANALYSIS (GROQ)
 # -------------------------------------------------
-async def analyze_resume_with_ai(resume_text: str, role_target: Optional[str]) -> dict:
-    # Validate resume content first
-    is_valid, message = validate_resume_content(resume_text)
-    if not is_valid:
-        raise HTTPException(status_code=400, detail=message)
-    
+async def call_llm_json(
+    prompt: str,
+    validate=None,
+    max_tokens: int = 2048,
+    usage: Optional[LLMUsage] = None,
+    ticket: Optional[QueueTicket] = None,
+) -> dict:
+    """
+    Send a prompt to Groq and parse the JSON reply, retrying up to 3 times.
+    An optional validate(result) callable may raise ValueError to force a retry.
+    Tokens, attempts and latency of every attempt are added to `usage`.
+    The call waits for a scheduler slot in the ticket's tier (free by default).
+    """
     if not os.environ.get("GROQ_API_KEY"):
-        raise HTTPException(status_code=500, detail="GROQ_API_KEY not configured")
+        raise LLMUnavailableError(status_code=500, detail="GROQ_API_KEY not configured")
 
-    client_groq = Groq(api_key=os.environ["GROQ_API_KEY"])
+    if llm_circuit.is_open():
+        raise LLMUnavailableError(status_code=503, detail="AI service temporarily unavailable")
 
-    # Trim resume to avoid token overflow
-    resume_text = resume_text[:MAX_RESUME_CHARS]
+    client_groq = get_groq_client()
 
-    prompt = f"""You are a senior ATS (Applicant Tracking System) evaluator, technical recruiter, and resume strategist with 10+ years of real-world hiring experience across product companies, startups, and MNCs.
+    last_error = None
 
-Your task is to evaluate the resume below for the given role and provide an HONEST, REALISTIC, and CLEAR analysis.
+    async with llm_scheduler.slot(ticket or QueueTicket(TIER_FREE)):
+        for attempt in range(1, 4):
+            started = time.perf_counter()
+            try:
+                logger.info(f"[AI] Attempt {attempt}")
+                response = await asyncio.to_thread(
+                    client_groq.chat.completions.create,
+                    model="llama-3.1-8b-instant",
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=max_tokens,
+                )
+                if usage:
+                    usage.add_response(response)
+
+                if not response.choices or not response.choices[0].message:
+                    raise ValueError("Groq response has no message")
+
+                text = response.choices[0].message.content.strip()
+                logger.info(f"[AI] Raw response length: {len(text)}")
+            
+                result = extract_json(text)
+                if validate:
+                    validate(result)
+                logger.info("[AI] JSON parsed successfully")
+                llm_circuit.record_success()
+                return result
+
+            except Exception as e:
+                last_error = e
+                logger.warning(f"[AI] Attempt {attempt} failed: {str(e)}")
+            finally:
+                if usage:
+                    usage.attempts += 1
+                    usage.latency_ms += round((time.perf_counter() - started) * 1000)
+
+    llm_circuit.record_failure()
+    raise LLMUnavailableError(
+        status_code=500,
+        detail=f"AI analysis failed after retries: {str(last_error)}",
+    )
 
-IMPORTANT MINDSET:
-- Do NOT be overly positive.
-- Do NOT be harsh without reason.
-- Score resumes the way a real recruiter + ATS would.
-- Two average resumes must NOT receive the same feedback unless they are truly identical.
 
-TARGET ROLE:
-{role_target or "general job applications"}
-
-==============================
+# Static prompt blocks shared by the single-resume and batch prompts
+ANALYSIS_GUIDELINES = """==============================
 SCORING CALIBRATION (CRITICAL)
 ==============================
 Use this scale STRICTLY:
@@ -332,10 +938,9 @@ OUTPUT INSTRUCTIONS (VERY IMPORTANT)
 - Return ONLY valid JSON.
 - NO markdown, NO explanations, NO extra text.
 
-==============================
-RESPONSE JSON FORMAT
-==============================
-{{
+"""
+
+ANALYSIS_RESULT_FORMAT = """{
   "overall_score": 0-100 integer,
   "score_verdict": "one short honest sentence explaining the score",
   "summary_insight": "1–2 lines explaining the biggest reason this resume is not scoring higher",
@@ -359,18 +964,18 @@ RESPONSE JSON FORMAT
   ],
 
   "improved_bullets": [
-    {{
+    {
       "original": "exact original resume bullet",
       "improved": "improved version using strong verbs + realistic metric + clear impact"
-    }},
-    {{
+    },
+    {
       "original": "exact original resume bullet",
       "improved": "improved version using strong verbs + realistic metric + clear impact"
-    }},
-    {{
+    },
+    {
       "original": "exact original resume bullet",
       "improved": "improved version using strong verbs + realistic metric + clear impact"
-    }}
+    }
   ],
 
   "recommendations": [
@@ -378,9 +983,9 @@ RESPONSE JSON FORMAT
     "clear and actionable recommendation",
     "clear and actionable recommendation"
   ]
-}}
+}"""
 
-==============================
+ANALYSIS_QUALITY_RULES = """==============================
 CRITICAL QUALITY RULES
 ==============================
 - Metrics must feel realistic (avoid extreme or fake numbers).
@@ -388,47 +993,577 @@ CRITICAL QUALITY RULES
 - Feedback must clearly explain HOW to improve, not just WHAT is wrong.
 - The analysis must feel like it was written by a human recruiter.
 
+"""
+
+
+def build_analysis_prompt(resume_text: str, role_target: Optional[str]) -> str:
+    # Trim resume to avoid token overflow
+    resume_text = resume_text[:MAX_RESUME_CHARS]
+
+    return f"""You are a senior ATS (Applicant Tracking System) evaluator, technical recruiter, and resume strategist with 10+ years of real-world hiring experience across product companies, startups, and MNCs.
+
+Your task is to evaluate the resume below for the given role and provide an HONEST, REALISTIC, and CLEAR analysis.
+
+IMPORTANT MINDSET:
+- Do NOT be overly positive.
+- Do NOT be harsh without reason.
+- Score resumes the way a real recruiter + ATS would.
+- Two average resumes must NOT receive the same feedback unless they are truly identical.
+
+TARGET ROLE:
+{role_target or "general job applications"}
+
+{ANALYSIS_GUIDELINES}==============================
+RESPONSE JSON FORMAT
 ==============================
+{ANALYSIS_RESULT_FORMAT}
+
+{ANALYSIS_QUALITY_RULES}==============================
 RESUME TO ANALYZE
 ==============================
 {resume_text}
 """
 
-    last_error = None
 
-    for attempt in range(1, 4):
+async def analyze_resume_with_ai(
+    resume_text: str,
+    role_target: Optional[str],
+    usage: Optional[LLMUsage] = None,
+    ticket: Optional[QueueTicket] = None,
+) -> dict:
+    # Validate resume content first
+    is_valid, message = validate_resume_content(resume_text)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+
+    return await call_llm_json(build_analysis_prompt(resume_text, role_target), usage=usage, ticket=ticket)
+
+
+# -------------------------------------------------
+# BULK BATCHING
+# -------------------------------------------------
+ANALYSIS_LIST_FIELDS = ("strengths", "weaknesses", "ats_issues", "improved_bullets", "recommendations")
+
+
+def is_valid_analysis(result) -> bool:
+    """Check a single analysis has the fields the frontend relies on."""
+    if not isinstance(result, dict):
+        return False
+    try:
+        score = int(result.get("overall_score"))
+    except (TypeError, ValueError):
+        return False
+    if not 0 <= score <= 100:
+        return False
+    return all(isinstance(result.get(field), list) for field in ANALYSIS_LIST_FIELDS)
+
+
+def build_batch_prompt(items: list[tuple[str, Optional[str]]]) -> str:
+    resume_blocks = "\n\n".join(
+        f"### RESUME id={i}\nTARGET ROLE: {role_target or 'general job applications'}\n{resume_text}"
+        for i, (resume_text, role_target) in enumerate(items)
+    )
+    ids = ", ".join(str(i) for i in range(len(items)))
+
+    return f"""You are a senior ATS (Applicant Tracking System) evaluator, technical recruiter, and resume strategist with 10+ years of real-world hiring experience across product companies, startups, and MNCs.
+
+Your task is to evaluate EACH resume below for its own target role and provide an HONEST, REALISTIC, and CLEAR analysis.
+Evaluate every resume independently. Never mix content between resumes.
+
+IMPORTANT MINDSET:
+- Do NOT be overly positive.
+- Do NOT be harsh without reason.
+- Score resumes the way a real recruiter + ATS would.
+- Two average resumes must NOT receive the same feedback unless they are truly identical.
+
+{ANALYSIS_GUIDELINES}==============================
+RESPONSE JSON FORMAT
+==============================
+Return one object with a "results" array containing exactly one entry per resume id ({ids}).
+Each entry is {{"id": <resume id>, "analysis": <object in the format below>}}.
+
+{ANALYSIS_RESULT_FORMAT}
+
+{ANALYSIS_QUALITY_RULES}==============================
+RESUMES TO ANALYZE
+==============================
+{resume_blocks}
+"""
+
+
+async def analyze_batch_with_ai(items: list[tuple[str, Optional[str]]]) -> dict[int, dict]:
+    """
+    Analyze several short resumes in one completion.
+    Returns the valid per-resume results keyed by position; missing or
+    malformed entries are left out for the caller to retry individually.
+    """
+    def validate(result: dict):
+        if not isinstance(result.get("results"), list):
+            raise ValueError("Response has no results array")
+
+    result = await call_llm_json(
+        build_batch_prompt(items),
+        validate=validate,
+        max_tokens=min(8192, BATCH_MAX_TOKENS_PER_RESUME * len(items)),
+        ticket=QueueTicket(TIER_INTERNAL),
+    )
+
+    analyses = {}
+    for entry in result["results"]:
+        if not isinstance(entry, dict):
+            continue
         try:
-            logger.info(f"[AI] Attempt {attempt}")
-            response = await asyncio.to_thread(
-                client_groq.chat.completions.create,
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2048,
-            )
+            index = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(items) and is_valid_analysis(entry.get("analysis")):
+            analyses[index] = entry["analysis"]
+    return analyses
 
-            if not response.choices or not response.choices[0].message:
-                raise ValueError("Groq response has no message")
 
-            text = response.choices[0].message.content.strip()
-            logger.info(f"[AI] Raw response length: {len(text)}")
-            
-            result = extract_json(text)
-            logger.info("[AI] JSON parsed successfully")
-            return result
+class AnalysisBatcher:
+    """
+    Collects short resumes for up to `max_wait_ms` or `max_items`, sends
+    them in a single completion, and resolves each caller with its own
+    result. Anything the batch call fails to return is retried on its own.
+    """
 
-        except Exception as e:
-            last_error = e
-            logger.warning(f"[AI] Attempt {attempt} failed: {str(e)}")
+    def __init__(self, max_items: int, max_wait_ms: int, max_chars: int):
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self.max_chars = max_chars
+        self._pending: list[tuple[str, Optional[str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, resume_text: str, role_target: Optional[str]) -> dict:
+        if len(resume_text) > self.max_chars or self.max_items < 2:
+            return await analyze_resume_with_ai(resume_text, role_target, ticket=QueueTicket(TIER_INTERNAL))
+
+        is_valid, message = validate_resume_content(resume_text)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=message)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((resume_text, role_target, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, Optional[str], asyncio.Future]]):
+        results = {}
+        if len(batch) > 1:
+            try:
+                results = await analyze_batch_with_ai([(text, role) for text, role, _ in batch])
+                logger.info(f"[BATCH] {len(results)}/{len(batch)} resumes scored in one call")
+            except Exception as e:
+                logger.warning(f"[BATCH] Batch call failed, falling back to single calls: {str(e)}")
+
+        async def resolve(index: int, resume_text: str, role_target: Optional[str], future: asyncio.Future):
+            try:
+                result = results.get(index)
+                if result is None:
+                    result = await analyze_resume_with_ai(
+                        resume_text, role_target, ticket=QueueTicket(TIER_INTERNAL)
+                    )
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+        await asyncio.gather(*(
+            resolve(i, text, role, future) for i, (text, role, future) in enumerate(batch)
+        ))
+
+
+analysis_batcher = AnalysisBatcher(BATCH_MAX_ITEMS, BATCH_MAX_WAIT_MS, BATCH_MAX_RESUME_CHARS)
 
-    raise HTTPException(
-        status_code=500,
-        detail=f"AI analysis failed after retries: {str(last_error)}",
+
+# -------------------------------------------------
+# SECTION-LEVEL ANALYSIS
+# -------------------------------------------------
+def build_section_prompt(sections: dict[str, str], role_target: Optional[str]) -> str:
+    budget = MAX_RESUME_CHARS // max(len(sections), 1)
+    section_block = "\n\n".join(
+        f"### SECTION: {name}\n{text[:budget]}" for name, text in sections.items()
+    )
+    names = ", ".join(f'"{name}"' for name in sections)
+
+    return f"""You are a senior ATS (Applicant Tracking System) evaluator and technical recruiter with 10+ years of real-world hiring experience.
+
+Evaluate ONLY the resume sections below, each one on its own, for the given role.
+Be honest and realistic. Do NOT inflate scores. If impact, metrics, or clarity are missing, the score MUST drop.
+
+TARGET ROLE:
+{role_target or "general job applications"}
+
+SCORING SCALE (per section):
+90–100 → Exceptional, 80–89 → Very strong, 70–79 → Good, 60–69 → Average, 50–59 → Below average, <50 → Weak
+
+Look for: vague bullets ("worked on", "helped with"), missing metrics, long paragraphs instead of bullets,
+weak section content, keyword gaps for the target role, and non-standard formatting.
+
+Return ONLY valid JSON. NO markdown, NO explanations, NO extra text.
+The "sections" object MUST contain exactly these keys: {names}
+
+{{
+  "sections": {{
+    "<section name>": {{
+      "score": 0-100 integer,
+      "strengths": ["specific strength tied to this section"],
+      "weaknesses": ["clear weakness with real impact"],
+      "ats_issues": ["specific ATS parsing or formatting issue"],
+      "improved_bullets": [
+        {{"original": "exact original bullet", "improved": "improved version with strong verb + realistic metric + clear impact"}}
+      ],
+      "recommendations": ["clear and actionable recommendation"]
+    }}
+  }}
+}}
+
+Use 1–3 items per list. Leave "improved_bullets" empty for sections without bullets.
+
+==============================
+SECTIONS TO ANALYZE
+==============================
+{section_block}
+"""
+
+
+async def analyze_sections_with_ai(
+    sections: dict[str, str],
+    role_target: Optional[str],
+    usage: Optional[LLMUsage] = None,
+    ticket: Optional[QueueTicket] = None,
+) -> dict[str, dict]:
+    """Evaluate several resume sections in a single Groq call."""
+    def validate(result: dict):
+        returned = result.get("sections")
+        if not isinstance(returned, dict):
+            raise ValueError("Response has no sections object")
+        missing = [name for name in sections if not isinstance(returned.get(name), dict)]
+        if missing:
+            raise ValueError(f"Response is missing sections: {', '.join(missing)}")
+
+    result = await call_llm_json(
+        build_section_prompt(sections, role_target), validate=validate, usage=usage, ticket=ticket
+    )
+    return {name: result["sections"][name] for name in sections}
+
+
+async def find_previous_section_results(user_id: str, role_target: Optional[str], hashes: list[str]) -> dict[str, dict]:
+    """Map section hash -> stored section result from the user's latest matching analysis."""
+    summary = await db.analyses.find_one(
+        {
+            "user_id": user_id,
+            "role_target": role_target,
+            "section_hashes": {"$in": hashes},
+        },
+        {"_id": 0, "id": 1},
+        sort=[("created_at", -1)],
+    )
+    if not summary:
+        return {}
+    previous = await load_analysis(summary["id"])
+    return stored_section_results(previous) if previous else {}
+
+
+def stored_section_results(analysis: dict) -> dict[str, dict]:
+    """Map section hash -> section result stored with an analysis."""
+    return {
+        record["hash"]: record["result"]
+        for record in analysis.get("section_results", [])
+        if record.get("hash") and isinstance(record.get("result"), dict)
+    }
+
+
+async def find_near_duplicate(user_id: str, role_target: Optional[str], fingerprint: str) -> Optional[dict]:
+    """Most similar recent analysis of a near-identical resume by the same user for the same role."""
+    if NEAR_DUPLICATE_SIMILARITY <= 0:
+        return None
+    candidates = await db.analyses.find(
+        {
+            "user_id": user_id,
+            "role_target": role_target,
+            "fingerprint_bands": {"$in": band_keys(fingerprint)},
+            "provisional": False,
+            "prompt_version": {"$in": [FULL_PROMPT_VERSION, SECTION_PROMPT_VERSION]},
+        },
+        {"_id": 0, "id": 1, "fingerprint": 1},
+        sort=[("created_at", -1)],
+    ).limit(NEAR_DUPLICATE_CANDIDATES).to_list(None)
+
+    best = max(candidates, key=lambda c: similarity(c["fingerprint"], fingerprint), default=None)
+    if not best or similarity(best["fingerprint"], fingerprint) < NEAR_DUPLICATE_SIMILARITY:
+        return None
+    return best
+
+
+def reuse_analysis(previous: dict, sections: dict[str, str], fingerprint: str) -> AnalysisOutcome:
+    """Serve a stored near-duplicate analysis, keeping section records only for unchanged sections."""
+    previous_results = stored_section_results(previous)
+    hashes = {name: section_hash(text) for name, text in sections.items()}
+    section_records = [
+        {"name": name, "hash": digest, "result": previous_results[digest]}
+        for name, digest in hashes.items()
+        if digest in previous_results
+    ]
+    return AnalysisOutcome(
+        analysis=previous["analysis_result"],
+        prompt_version=previous["prompt_version"],
+        section_results=section_records,
+        sections_reused=len(section_records),
+        fingerprint=fingerprint,
+        reused_from=previous["id"],
+    )
+
+
+async def run_analysis(
+    user_id: str,
+    resume_text: str,
+    role_target: Optional[str],
+    usage: Optional[LLMUsage] = None,
+    ticket: Optional[QueueTicket] = None,
+) -> AnalysisOutcome:
+    """
+    Analyze a resume section by section, re-using stored results for any
+    section whose content hash matches the user's previous analysis.
+    The closest near-duplicate analysis, if any, also seeds that re-use.
+    Resumes without recognisable sections fall back to a single full
+    analysis, or are served a near-duplicate's analysis whole.
+    """
+    is_valid, message = validate_resume_content(resume_text)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+
+    fingerprint = minhash(resume_text[:MAX_RESUME_CHARS])
+    sections = evaluable_sections(resume_text[:MAX_RESUME_CHARS])
+
+    duplicate = await find_near_duplicate(user_id, role_target, fingerprint)
+    nearest = await load_analysis(duplicate["id"]) if duplicate else None
+
+    if len(sections) < 2:
+        if nearest and isinstance(nearest.get("analysis_result"), dict):
+            logger.info(f"[AI] Near-duplicate of analysis {nearest['id']}, re-using its result")
+            return reuse_analysis(nearest, sections, fingerprint)
+        return AnalysisOutcome(
+            analysis=await analyze_resume_with_ai(resume_text, role_target, usage, ticket),
+            prompt_version=FULL_PROMPT_VERSION,
+            fingerprint=fingerprint,
+        )
+
+    hashes = {name: section_hash(text) for name, text in sections.items()}
+    previous = await find_previous_section_results(user_id, role_target, list(hashes.values()))
+    if nearest:
+        # Edited sections still miss on their hash and are re-evaluated below
+        previous = {**stored_section_results(nearest), **previous}
+
+    section_results = {
+        name: previous[digest] for name, digest in hashes.items() if digest in previous
+    }
+    changed = {name: text for name, text in sections.items() if name not in section_results}
+
+    if changed:
+        logger.info(f"[AI] Re-evaluating sections: {', '.join(changed)} (reused {len(section_results)})")
+        section_results.update(await analyze_sections_with_ai(changed, role_target, usage, ticket))
+    else:
+        logger.info("[AI] All sections unchanged, re-using previous results")
+
+    ordered = {name: section_results[name] for name in sections}
+    section_records = [
+        {"name": name, "hash": hashes[name], "result": result}
+        for name, result in ordered.items()
+    ]
+    return AnalysisOutcome(
+        analysis=combine_section_results(ordered),
+        prompt_version=SECTION_PROMPT_VERSION,
+        section_results=section_records,
+        sections_reused=len(sections) - len(changed),
+        fingerprint=fingerprint,
     )
 
 
+# -------------------------------------------------
+# ANALYSIS STORAGE
+# -------------------------------------------------
+# `analyses` holds small summary documents for listing and aggregation; the
+# full result lives in `analysis_details` as a zlib-compressed JSON blob that
+# is only loaded when a single analysis is opened.
+DETAIL_FIELDS = {"resume_text", "analysis_result", "section_results"}
+# Bookkeeping stored with an analysis that the analysis routes never return
+INTERNAL_FIELDS = {"section_hashes", "fingerprint", "fingerprint_bands", "resume_terms", "llm_usage"}
+
+
+def result_summary(result: dict) -> dict:
+    """The listing fields derived from an analysis result."""
+    strengths = result.get("strengths") or []
+    return {
+        "overall_score": result.get("overall_score"),
+        "headline": str(strengths[0])[:200] if strengths else "",
+        "provisional": bool(result.get("provisional")),
+    }
+
+
+def analysis_summary(resume_analysis: ResumeAnalysis) -> dict:
+    summary = resume_analysis.model_dump(
+        mode="json",
+        include={"id", "user_id", "role_target", "prompt_version", "reused_from", "llm_usage", "created_at"},
+    )
+    summary.update(result_summary(resume_analysis.analysis_result))
+    summary.update({
+        "section_hashes": [record["hash"] for record in resume_analysis.section_results],
+        "fingerprint": resume_analysis.fingerprint,
+        # A served copy is not itself a candidate, or reuse would drift one edit at a time
+        "fingerprint_bands": (
+            band_keys(resume_analysis.fingerprint)
+            if resume_analysis.fingerprint and not resume_analysis.reused_from
+            else []
+        ),
+    })
+    return summary
+
+
+def pack_detail(doc: dict) -> Binary:
+    payload = {field: doc.get(field) for field in DETAIL_FIELDS}
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return Binary(zlib.compress(raw, 6))
+
+
+def unpack_detail(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob))
+
+
+def analysis_detail(resume_analysis: ResumeAnalysis) -> dict:
+    doc = resume_analysis.model_dump(mode="json")
+    return {
+        "id": doc["id"],
+        "user_id": doc["user_id"],
+        "created_at": doc["created_at"],
+        "resume_terms": doc["resume_terms"],
+        "data": pack_detail(doc),
+    }
+
+
+async def save_analysis(resume_analysis: ResumeAnalysis):
+    summary = analysis_summary(resume_analysis)
+    await db.analysis_details.insert_one(analysis_detail(resume_analysis))
+    await db.analyses.insert_one(summary)
+    try:
+        await record_rollups(summary)
+    except Exception as e:
+        logger.warning(f"[ANALYTICS] Rollup update failed for {summary['id']}: {str(e)}")
+
+
+async def load_analysis(analysis_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+    """Summary fields merged with the decompressed detail blob."""
+    query = {"id": analysis_id}
+    if user_id:
+        query["user_id"] = user_id
+    summary = await db.analyses.find_one(query, {"_id": 0})
+    if not summary:
+        return None
+    if "analysis_result" in summary:
+        # Legacy inline document that has not been migrated yet
+        return summary
+
+    detail = await db.analysis_details.find_one({"id": analysis_id}, {"_id": 0, "data": 1})
+    if not detail:
+        return None
+    summary.update(unpack_detail(detail["data"]))
+    return summary
+
+
+# -------------------------------------------------
+# ANALYTICS ROLLUPS
+# -------------------------------------------------
+# `analytics_rollups` keeps one document per (day, role) with count, score sum
+# and a 10-point score histogram; `user_score_rollups` keeps per-user totals.
+# Both are updated with $inc as analyses are stored, so dashboards read
+# O(buckets) documents instead of scanning `analyses`.
+SCORE_BUCKETS = [str(low) for low in range(0, 100, 10)]
+
+
+# LLMUsage field -> rollup field
+USAGE_ROLLUP_FIELDS = {
+    "prompt_tokens": "prompt_tokens",
+    "completion_tokens": "completion_tokens",
+    "attempts": "llm_attempts",
+    "latency_ms": "llm_latency_ms",
+}
+
+
+def rollup_role(role_target: Optional[str]) -> str:
+    role = " ".join((role_target or "").lower().split())[:60]
+    return role or "general"
+
+
+def rollup_day(created_at) -> str:
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.astimezone(timezone.utc).date().isoformat()
+
+
+def rollup_increments(summary: dict) -> tuple[dict, dict, dict]:
+    """Return (bucket key, bucket $inc, user $inc) for one analysis summary."""
+    key = {"day": rollup_day(summary["created_at"]), "role": rollup_role(summary.get("role_target"))}
+    bucket_inc = {"count": 1}
+    user_inc = {"count": 1}
+
+    # LLM usage is counted for every analysis, including failed ones that fell back
+    usage = summary.get("llm_usage") or {}
+    for field, rollup_field in USAGE_ROLLUP_FIELDS.items():
+        if usage.get(field):
+            bucket_inc[rollup_field] = usage[field]
+            user_inc[rollup_field] = usage[field]
+
+    score = summary.get("overall_score")
+    if summary.get("provisional") or not isinstance(score, (int, float)):
+        # Local fallback scores are counted for volume but kept out of score stats
+        bucket_inc["provisional"] = 1
+        return key, bucket_inc, user_inc
+
+    score = max(0, min(100, int(score)))
+    bucket = SCORE_BUCKETS[min(score // 10, len(SCORE_BUCKETS) - 1)]
+    bucket_inc.update({"scored": 1, "score_sum": score, f"histogram.{bucket}": 1})
+    user_inc.update({"scored": 1, "score_sum": score})
+    return key, bucket_inc, user_inc
+
+
+async def record_rollups(summary: dict):
+    key, bucket_inc, user_inc = rollup_increments(summary)
+    await db.analytics_rollups.update_one(key, {"$inc": bucket_inc}, upsert=True)
+    await db.user_score_rollups.update_one(
+        {"user_id": summary["user_id"]}, {"$inc": user_inc}, upsert=True
+    )
+
+
+def average(score_sum: float, scored: int) -> Optional[float]:
+    return round(score_sum / scored, 1) if scored else None
+
+
+def usage_totals(rollup: dict) -> dict:
+    totals = {field: rollup.get(field, 0) for field in USAGE_ROLLUP_FIELDS.values()}
+    totals["avg_llm_latency_ms"] = average(totals["llm_latency_ms"], totals["llm_attempts"])
+    return totals
+
+
 # -------------------------------------------------
 # AUTH ROUTES
 # -------------------------------------------------
@@ -454,6 +1589,9 @@ async def send_otp(req: OtpRequest):
                 {"email": req.email},
                 {"$set": {"otp_code": otp_code, "otp_expiry": expiry}},
             )
+            # Legacy user documents may lack `id`; those are never cached by it
+            if user.get("id"):
+                user_cache.invalidate(user["id"])
 
         # Send OTP email
         email_sent = await send_otp_email(req.email, otp_code)
@@ -498,6 +1636,7 @@ async def verify_otp(req: OtpVerify):
             {"id": user_id},
             {"$set": {"otp_code": None, "otp_expiry": None}},
         )
+        user_cache.invalidate(user_id)
 
         logger.info(f"[AUTH] User verified: {user['email']}")
         return {
@@ -516,8 +1655,71 @@ async def verify_otp(req: OtpVerify):
 # -------------------------------------------------
 # ANALYSIS ROUTES
 # -------------------------------------------------
+async def analyze_and_store(
+    user: dict, resume_text: str, role_target: Optional[str], ticket: Optional[QueueTicket] = None
+) -> dict:
+    """Run the analysis, save it with its section results and LLM usage, and count the usage."""
+    user_id = user["id"]
+    usage = LLMUsage()
+    try:
+        outcome = await run_analysis(user_id, resume_text, role_target, usage, ticket)
+    except LLMUnavailableError as e:
+        # Degraded mode: serve the local rule-based score and don't charge for it
+        logger.warning(f"[ANALYZE] LLM unavailable, serving local ATS score: {e.detail}")
+        outcome = AnalysisOutcome(
+            analysis=score_resume(resume_text[:MAX_RESUME_CHARS]),
+            prompt_version=LOCAL_SCORER_VERSION,
+            provisional=True,
+        )
+
+    # Create and save analysis to database
+    resume_analysis = ResumeAnalysis(
+        user_id=user_id,
+        resume_text=resume_text[:500],
+        role_target=role_target,
+        prompt_version=outcome.prompt_version,
+        analysis_result=outcome.analysis,
+        section_results=outcome.section_results,
+        resume_terms=term_frequencies(resume_text[:MAX_RESUME_CHARS]),
+        fingerprint=outcome.fingerprint,
+        reused_from=outcome.reused_from,
+        llm_usage=usage,
+    )
+    await save_analysis(resume_analysis)
+    index_resume(resume_analysis.model_dump(mode="json"))
+
+    # Only an analysis that called the LLM is charged: results re-used from
+    # earlier analyses are free, and tokens spent on failed attempts are
+    # recorded above but not charged
+    used = 1 if usage.attempts and not outcome.provisional else 0
+    tokens_used = user.get("tokens_used", 0)
+    if used:
+        updated = await increment_usage(user_id, usage.total_tokens)
+        tokens_used = (updated or {}).get("tokens_used", tokens_used + usage.total_tokens)
+
+    return {
+        "analysis_id": resume_analysis.id,
+        "analysis": outcome.analysis,
+        "provisional": outcome.provisional,
+        "sections_reused": outcome.sections_reused,
+        "reused_from": outcome.reused_from,
+        "usage": usage.model_dump(),
+        "remaining_uses": FREE_TIER_LIMIT - user.get("usage_count", 0) - used,
+        "remaining_tokens": max(FREE_TIER_TOKEN_BUDGET - tokens_used, 0) if FREE_TIER_TOKEN_BUDGET else None,
+    }
+
+
+@api_router.post("/analyze/quick")
+async def analyze_quick(request: ResumeTextRequest):
+    """Instant rule-based ATS score; no LLM call and no usage charged."""
+    is_valid, message = validate_resume_content(request.resume_text)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=message)
+    return {"analysis": score_resume(request.resume_text[:MAX_RESUME_CHARS])}
+
+
 @api_router.post("/analyze/text")
-async def analyze_text(request: ResumeTextRequest, user_id: str = ""):
+async def analyze_text(request: ResumeTextRequest, http_request: Request, user_id: str = ""):
     try:
         if not user_id:
             raise HTTPException(status_code=400, detail="user_id is required")
@@ -526,29 +1728,11 @@ async def analyze_text(request: ResumeTextRequest, user_id: str = ""):
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        if user.get("usage_count", 0) >= FREE_TIER_LIMIT:
+        if quota_exhausted(user):
             raise HTTPException(status_code=403, detail="Usage limit reached")
 
-        analysis = await analyze_resume_with_ai(
-            request.resume_text,
-            request.role_target,
-        )
-
-        # Create and save analysis to database
-        resume_analysis = ResumeAnalysis(
-            user_id=user_id,
-            resume_text=request.resume_text[:500],
-            analysis_result=analysis
-        )
-        await db.analyses.insert_one(resume_analysis.model_dump(mode="json"))
-
-        await db.users.update_one({"id": user_id}, {"$inc": {"usage_count": 1}})
-
-        return {
-            "analysis_id": resume_analysis.id,
-            "analysis": analysis,
-            "remaining_uses": FREE_TIER_LIMIT - user.get("usage_count", 0) - 1,
-        }
+        ticket = QueueTicket(user_tier(user), http_request.is_disconnected)
+        return await analyze_and_store(user, request.resume_text, request.role_target, ticket)
     except HTTPException:
         raise
     except Exception as e:
@@ -558,6 +1742,7 @@ async def analyze_text(request: ResumeTextRequest, user_id: str = ""):
 
 @api_router.post("/analyze/pdf")
 async def analyze_pdf(
+    http_request: Request,
     file: UploadFile = File(...),
     user_id: str = "",
     role_target: Optional[str] = None,
@@ -566,37 +1751,33 @@ async def analyze_pdf(
         if not user_id:
             raise HTTPException(status_code=400, detail="user_id is required")
 
+        # UploadLimitMiddleware has already cut off oversized and non-PDF
+        # bodies while they streamed in; the checks here cover a file part
+        # it couldn't see the start of. The body is spooled by the multipart
+        # parser (memory up to UPLOAD_SPOOL_BYTES, then disk) and parsed in place.
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise UploadTooLargeError()
+        if await file.read(len(PDF_MAGIC)) != PDF_MAGIC:
+            raise UnsupportedUploadError()
+        await file.seek(0)
+
         user = await get_user_by_id(user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        if user.get("usage_count", 0) >= FREE_TIER_LIMIT:
+        if quota_exhausted(user):
             raise HTTPException(status_code=403, detail="Usage limit reached")
 
-        contents = await file.read()
-        pdf = PdfReader(io.BytesIO(contents))
-        resume_text = "".join(page.extract_text() or "" for page in pdf.pages)
+        try:
+            resume_text = await asyncio.to_thread(extract_pdf_text, file.file)
+        except PdfReadError:
+            raise HTTPException(status_code=400, detail="Could not read PDF file")
 
         if not resume_text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
 
-        analysis = await analyze_resume_with_ai(resume_text, role_target)
-
-        # Create and save analysis to database
-        resume_analysis = ResumeAnalysis(
-            user_id=user_id,
-            resume_text=resume_text[:500],
-            analysis_result=analysis
-        )
-        await db.analyses.insert_one(resume_analysis.model_dump(mode="json"))
-
-        await db.users.update_one({"id": user_id}, {"$inc": {"usage_count": 1}})
-
-        return {
-            "analysis_id": resume_analysis.id,
-            "analysis": analysis,
-            "remaining_uses": FREE_TIER_LIMIT - user.get("usage_count", 0) - 1,
-        }
+        ticket = QueueTicket(user_tier(user), http_request.is_disconnected)
+        return await analyze_and_store(user, resume_text, role_target, ticket)
     except HTTPException:
         raise
     except Exception as e:
@@ -604,53 +1785,354 @@ async def analyze_pdf(
         raise HTTPException(status_code=500, detail="PDF analysis failed")
 
 
+@api_router.post("/analyze/bulk", dependencies=[Depends(require_admin)])
+async def analyze_bulk(request: BulkAnalyzeRequest):
+    """Score many resumes at once; short ones share LLM calls through the batcher."""
+    outcomes = await asyncio.gather(
+        *(analysis_batcher.submit(item.resume_text, item.role_target) for item in request.resumes),
+        return_exceptions=True,
+    )
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, HTTPException):
+            results.append({"index": index, "error": outcome.detail})
+        elif isinstance(outcome, Exception):
+            logger.error(f"[BULK] Resume {index} failed: {str(outcome)}")
+            results.append({"index": index, "error": "Analysis failed"})
+        else:
+            results.append({"index": index, "analysis": outcome})
+    return {"results": results}
+
+
+# -------------------------------------------------
+# JOB MATCHING
+# -------------------------------------------------
+# Latest resume per user, kept in memory for ranking against job descriptions.
+# Each worker has its own copy, so resumes stored by other workers are picked
+# up by re-reading recent analyses every RESUME_INDEX_REFRESH_SECONDS.
+RESUME_INDEX_REFRESH_SECONDS = float(os.environ.get("RESUME_INDEX_REFRESH_SECONDS", "60"))
+# Analyses are stamped before they are saved, so each refresh also re-reads
+# this far behind the previous one; re-indexing a resume is idempotent
+RESUME_INDEX_REFRESH_OVERLAP_SECONDS = 120
+
+resume_index = ResumeIndex()
+resume_index_loaded_at: Optional[datetime] = None
+resume_index_task: Optional[asyncio.Task] = None
+
+
+def index_resume(analysis: dict):
+    if not analysis.get("resume_terms"):
+        return
+    resume_index.add(
+        analysis["user_id"],
+        analysis["resume_terms"],
+        {"user_id": analysis["user_id"], "analysis_id": analysis["id"]},
+    )
+
+
+async def load_resume_index():
+    """Index every stored resume on the first call, then only those created since the last call."""
+    global resume_index_loaded_at
+    started = datetime.now(timezone.utc)
+    query = {"resume_terms": {"$exists": True, "$ne": {}}}
+    if resume_index_loaded_at:
+        since = resume_index_loaded_at - timedelta(seconds=RESUME_INDEX_REFRESH_OVERLAP_SECONDS)
+        # Same format as the created_at strings written by analysis_detail()
+        query["created_at"] = {"$gte": since.strftime("%Y-%m-%dT%H:%M:%S.%fZ")}
+
+    cursor = db.analysis_details.find(
+        query, {"_id": 0, "id": 1, "user_id": 1, "resume_terms": 1}
+    ).sort("created_at", 1)
+    async for analysis in cursor:
+        index_resume(analysis)
+    if not resume_index_loaded_at:
+        logger.info(f"[MATCH] Indexed {len(resume_index)} resumes")
+    resume_index_loaded_at = started
+
+
+async def refresh_resume_index():
+    while True:
+        await asyncio.sleep(RESUME_INDEX_REFRESH_SECONDS)
+        try:
+            await load_resume_index()
+        except Exception as e:
+            logger.warning(f"[MATCH] Resume index refresh failed: {str(e)}")
+
+
+@api_router.post("/match")
+async def match_job_description(request: MatchRequest):
+    """Keyword coverage and TF-IDF/BM25 similarity of a resume against a JD, without an LLM call."""
+    if not request.resume_text.strip() or not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="resume_text and job_description are required")
+
+    return match_resume(
+        request.resume_text[:MAX_RESUME_CHARS],
+        request.job_description[:MAX_JOB_DESCRIPTION_CHARS],
+        request.role_target,
+        resume_index,
+    )
+
+
+@api_router.post("/match/rank", dependencies=[Depends(require_admin)])
+async def rank_resumes(request: RankRequest):
+    """Rank every indexed resume against a job description by BM25 score."""
+    if not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="job_description is required")
+
+    query = term_frequencies(request.job_description[:MAX_JOB_DESCRIPTION_CHARS])
+    return {
+        "indexed_resumes": len(resume_index),
+        "results": resume_index.rank(query, request.limit),
+    }
+
+
 # -------------------------------------------------
 # USER & ANALYSIS GET ROUTES
 # -------------------------------------------------
 @api_router.get("/user/{user_id}")
-async def get_user(user_id: str):
+async def get_user(user_id: str, response: Response, if_none_match: Optional[str] = Header(default=None)):
     user = await get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+
+    etag = weak_etag(user_id, user["usage_count"], user.get("tokens_used", 0), FREE_TIER_LIMIT, FREE_TIER_TOKEN_BUDGET)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
     return {
         "id": user["id"],
         "email": user["email"],
         "usage_count": user["usage_count"],
-        "usage_limit": FREE_TIER_LIMIT
+        "usage_limit": FREE_TIER_LIMIT,
+        "tokens_used": user.get("tokens_used", 0),
+        "token_budget": FREE_TIER_TOKEN_BUDGET or None,
     }
 
 
 @api_router.get("/analyses/{user_id}")
-async def get_analyses(user_id: str):
+async def get_analyses(user_id: str, response: Response, if_none_match: Optional[str] = Header(default=None)):
     user = await get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    analyses = await db.analyses.find({"user_id": user_id}, {"_id": 0}).to_list(None)
+
+    # The history only changes when an analysis is added, so the latest
+    # timestamp (plus usage_count) identifies it without loading the list.
+    latest = await db.analyses.find_one(
+        {"user_id": user_id}, {"_id": 0, "created_at": 1}, sort=[("created_at", -1)]
+    )
+    etag = weak_etag(user_id, user.get("usage_count", 0), latest["created_at"] if latest else "")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    analyses = await db.analyses.find(
+        {"user_id": user_id},
+        {"_id": 0, **{field: 0 for field in INTERNAL_FIELDS | DETAIL_FIELDS}},
+        sort=[("created_at", 1)],
+    ).to_list(None)
+
+    # Legacy inline documents that have not been migrated yet keep their
+    # score under analysis_result; fetch just those fields for them
+    legacy = {analysis["id"]: analysis for analysis in analyses if "overall_score" not in analysis}
+    if legacy:
+        async for doc in db.analyses.find(
+            {"id": {"$in": list(legacy)}},
+            {
+                "_id": 0, "id": 1, "analysis_result.overall_score": 1,
+                "analysis_result.strengths": 1, "analysis_result.provisional": 1,
+            },
+        ):
+            legacy[doc["id"]].update(result_summary(doc.get("analysis_result") or {}))
     return {"analyses": analyses}
 
 
+@api_router.get("/analysis/{analysis_id}")
+async def get_analysis(analysis_id: str, user_id: str = ""):
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+
+    analysis = await load_analysis(analysis_id, user_id)
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    for field in INTERNAL_FIELDS:
+        analysis.pop(field, None)
+    return analysis
+
+
+# -------------------------------------------------
+# ADMIN ROUTES
+# -------------------------------------------------
+@api_router.get("/admin/analytics", dependencies=[Depends(require_admin)])
+async def get_analytics(days: int = 30, role: Optional[str] = None):
+    """Daily volume and LLM usage, and per-role score distribution, from the rollup documents."""
+    days = max(1, min(days, 366))
+    start_day = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date().isoformat()
+    query = {"day": {"$gte": start_day}}
+    if role:
+        query["role"] = rollup_role(role)
+
+    buckets = await db.analytics_rollups.find(query, {"_id": 0}).to_list(None)
+
+    daily: dict[str, dict] = {}
+    roles: dict[str, dict] = {}
+    for bucket in buckets:
+        day = daily.setdefault(bucket["day"], {"count": 0, **{field: 0 for field in USAGE_ROLLUP_FIELDS.values()}})
+        for field in day:
+            day[field] += bucket.get(field, 0)
+        totals = roles.setdefault(bucket["role"], {
+            "count": 0, "scored": 0, "score_sum": 0,
+            "histogram": {label: 0 for label in SCORE_BUCKETS},
+        })
+        totals["count"] += bucket.get("count", 0)
+        totals["scored"] += bucket.get("scored", 0)
+        totals["score_sum"] += bucket.get("score_sum", 0)
+        for label, count in (bucket.get("histogram") or {}).items():
+            totals["histogram"][label] = totals["histogram"].get(label, 0) + count
+
+    return {
+        "start_day": start_day,
+        "daily_volume": [
+            {"day": day, "count": daily[day]["count"], **usage_totals(daily[day])} for day in sorted(daily)
+        ],
+        "roles": sorted(
+            (
+                {
+                    "role": name,
+                    "count": totals["count"],
+                    "average_score": average(totals["score_sum"], totals["scored"]),
+                    "histogram": totals["histogram"],
+                }
+                for name, totals in roles.items()
+            ),
+            key=lambda item: item["count"],
+            reverse=True,
+        ),
+    }
+
+
+@api_router.get("/admin/llm-scheduler", dependencies=[Depends(require_admin)])
+async def get_llm_scheduler_metrics():
+    """Slots in use, queue depths and per-tier queue wait percentiles."""
+    return llm_scheduler.metrics()
+
+
+@api_router.get("/admin/analytics/users", dependencies=[Depends(require_admin)])
+async def get_user_analytics(limit: int = 50):
+    """Average score and LLM usage per user, most active users first."""
+    limit = max(1, min(limit, 500))
+    rollups = await db.user_score_rollups.find(
+        {}, {"_id": 0}, sort=[("count", -1)], limit=limit
+    ).to_list(None)
+    return {
+        "users": [
+            {
+                "user_id": rollup["user_id"],
+                "count": rollup.get("count", 0),
+                "average_score": average(rollup.get("score_sum", 0), rollup.get("scored", 0)),
+                **usage_totals(rollup),
+            }
+            for rollup in rollups
+        ]
+    }
+
+
 # -------------------------------------------------
 # HEALTH CHECK
 # -------------------------------------------------
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for deployment monitoring"""
-    try:
-        # Check database connection
-        await db.command("ping")
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "timestamp": datetime.now(timezone.utc).isoformat()
+WARMUP_TIMEOUT_SECONDS = float(os.environ.get("WARMUP_TIMEOUT_SECONDS", "10"))
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.environ.get("HEALTH_CHECK_INTERVAL", "15"))
+
+
+class Readiness:
+    """
+    Last known state of each dependency. /health reads it instead of pinging;
+    a background task keeps the database entry fresh.
+    """
+
+    def __init__(self):
+        self.dependencies: dict[str, dict] = {}
+        self.warmed_up = False
+
+    def record(self, name: str, error: Optional[str] = None):
+        self.dependencies[name] = {
+            "status": "ok" if error is None else "error",
+            "checked_at": datetime.now(timezone.utc).isoformat(),
         }
+        if error:
+            self.dependencies[name]["error"] = error
+
+    def is_ok(self, name: str) -> bool:
+        return self.dependencies.get(name, {}).get("status") == "ok"
+
+    @property
+    def ready(self) -> bool:
+        # Only the database is required; LLM outages fall back to local scoring
+        return self.warmed_up and self.is_ok("database")
+
+
+readiness = Readiness()
+readiness_task: Optional[asyncio.Task] = None
+
+
+async def warm_up_database():
+    # Concurrent pings each check out a connection, so the minimum pool is open before traffic
+    connections = max(1, MONGO_POOL_OPTIONS.get("minPoolSize", 1))
+    await asyncio.gather(*(db.command("ping") for _ in range(connections)))
+
+
+async def warm_up_llm():
+    await asyncio.to_thread(get_groq_client().models.list)
+
+
+async def warm_up_email():
+    await asyncio.to_thread(AccountApi(brevo_api_client).get_account)
+
+
+async def check_dependency(name: str, check):
+    try:
+        await asyncio.wait_for(check(), WARMUP_TIMEOUT_SECONDS)
+        readiness.record(name)
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "database": "disconnected",
-            "error": str(e),
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }, 500
+        error = str(e) or type(e).__name__
+        logger.warning(f"[HEALTH] {name} check failed: {error}")
+        readiness.record(name, error)
+
+
+async def warm_up():
+    """Open connections to every dependency before the worker starts serving."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        check_dependency("database", warm_up_database),
+        check_dependency("llm", warm_up_llm),
+        check_dependency("email", warm_up_email),
+    )
+    readiness.warmed_up = True
+    states = ", ".join(f"{name}={state['status']}" for name, state in readiness.dependencies.items())
+    logger.info(f"[HEALTH] Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms: {states}")
+
+
+async def refresh_readiness():
+    while True:
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+        await check_dependency("database", lambda: db.command("ping"))
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint for deployment monitoring; serves the cached readiness state."""
+    return JSONResponse(
+        {
+            "status": "healthy" if readiness.ready else "unhealthy",
+            "database": "connected" if readiness.is_ok("database") else "disconnected",
+            "dependencies": readiness.dependencies,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        status_code=200 if readiness.ready else 503,
+    )
 
 
 # -------------------------------------------------
@@ -659,6 +2141,39 @@ async def health_check():
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+async def startup():
+    global readiness_task, resume_index_task
+    await warm_up()
+
+    try:
+        await db.analyses.create_index([("user_id", 1), ("created_at", -1)])
+        await db.analyses.create_index([("user_id", 1), ("section_hashes", 1)])
+        await db.analyses.create_index([("user_id", 1), ("role_target", 1), ("fingerprint_bands", 1)])
+        await db.analysis_details.create_index("id", unique=True)
+        await db.analysis_details.create_index("created_at")
+        await db.analytics_rollups.create_index([("day", 1), ("role", 1)], unique=True)
+        await db.user_score_rollups.create_index("user_id", unique=True)
+        await db.user_score_rollups.create_index("count")
+    except Exception as e:
+        logger.warning(f"[DB] Index creation failed: {str(e)}")
+
+    try:
+        await load_resume_index()
+    except Exception as e:
+        logger.warning(f"[MATCH] Failed to load resume index: {str(e)}")
+
+    readiness_task = asyncio.create_task(refresh_readiness())
+    if RESUME_INDEX_REFRESH_SECONDS > 0:
+        resume_index_task = asyncio.create_task(refresh_resume_index())
+
+
 @app.on_event("shutdown")
 async def shutdown():
+    if readiness_task:
+        readiness_task.cancel()
+    if resume_index_task:
+        resume_index_task.cancel()
+    if groq_client:
+        groq_client.close()
     client.close()
@@ -169,12 +169,12 @@ const Dashboard = ({ user, logout }) => {
                           </div>
                         </div>
                         <p className="text-sm text-gray-400 mt-2 line-clamp-2">
-                          {analysis.analysis_result.strengths[0] || "Resume analyzed successfully"}
+                          {analysis.headline || "Resume analyzed successfully"}
                         </p>
                       </div>
                       <div className="text-right ml-4">
                         <div className="text-2xl font-bold text-[#00DC82]">
-                          {analysis.analysis_result.overall_score}
+                          {analysis.overall_score}
                         </div>
                         <div className="text-xs text-gray-500">Score</div>
                       </div>
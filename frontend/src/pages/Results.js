@@ -49,16 +49,16 @@ const Results = ({ user }) => {
   useEffect(() => {
     const fetchAnalysis = async () => {
       try {
-        const response = await axios.get(`${API}/analyses/${user.id}`);
-        const found = response.data.analyses.find(a => a.id === analysisId);
-        if (found) {
-          setAnalysis(found);
-        } else {
+        const response = await axios.get(`${API}/analysis/${analysisId}`, {
+          params: { user_id: user.id }
+        });
+        setAnalysis(response.data);
+      } catch (error) {
+        if (error.response?.status === 404) {
           toast.error("Analysis not found");
-          navigate('/dashboard');
+        } else {
+          toast.error("Failed to load analysis");
         }
-      } catch (error) {
-        toast.error("Failed to load analysis");
         navigate('/dashboard');
       } finally {
         setLoading(false);
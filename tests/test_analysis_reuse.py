@@ -0,0 +1,128 @@
+import asyncio
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+import server
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / "backend" / "benchmarks" / "corpus"
+SECTIONED = (CORPUS_DIR / "software_engineer.txt").read_text()
+UNSECTIONED = (CORPUS_DIR / "product_manager_noheaders.txt").read_text()
+ANALYSIS = json.loads((CORPUS_DIR / "analysis_result.json").read_text())
+ROLE = "backend engineer"
+
+
+class FakeBackend:
+    """In-memory stand-ins for the LLM and the analysis storage used by analyze_and_store."""
+
+    def __init__(self):
+        self.analyses: dict[str, dict] = {}
+        self.llm_calls: list[list[str]] = []
+        self.charged: list[int] = []
+        self.near_duplicate = None  # summary find_near_duplicate should return
+
+    async def call_llm_json(self, prompt, validate=None, max_tokens=2048, usage=None, ticket=None):
+        names = re.findall(r"### SECTION: (\w+)", prompt)
+        self.llm_calls.append(names)
+        if usage:
+            usage.attempts += 1
+        if not names:
+            return dict(ANALYSIS)
+        section = {
+            "score": 70, "strengths": [], "weaknesses": [], "ats_issues": [],
+            "improved_bullets": [], "recommendations": [],
+        }
+        return {"sections": {name: dict(section) for name in names}}
+
+    async def save_analysis(self, resume_analysis):
+        self.analyses[resume_analysis.id] = {
+            **resume_analysis.model_dump(mode="json"), **server.analysis_summary(resume_analysis)
+        }
+
+    async def load_analysis(self, analysis_id, user_id=None):
+        return self.analyses.get(analysis_id)
+
+    async def find_previous_section_results(self, user_id, role_target, hashes):
+        for analysis in reversed(list(self.analyses.values())):
+            if set(hashes) & set(analysis["section_hashes"]):
+                return server.stored_section_results(analysis)
+        return {}
+
+    async def find_near_duplicate(self, user_id, role_target, fingerprint):
+        return self.near_duplicate
+
+    async def increment_usage(self, user_id, tokens=0):
+        self.charged.append(tokens)
+        return None
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = FakeBackend()
+    for name in (
+        "call_llm_json", "save_analysis", "load_analysis", "find_previous_section_results",
+        "find_near_duplicate", "increment_usage",
+    ):
+        monkeypatch.setattr(server, name, getattr(fake, name))
+    monkeypatch.setattr(server, "index_resume", lambda analysis: None)
+    return fake
+
+
+def submit(text: str) -> dict:
+    user = {"id": "user-1", "usage_count": 0, "tokens_used": 0}
+    return asyncio.run(server.analyze_and_store(user, text, ROLE))
+
+
+def test_unchanged_resubmission_is_not_charged(backend):
+    first = submit(SECTIONED)
+    second = submit(SECTIONED)
+
+    assert len(backend.llm_calls) == 1
+    assert second["sections_reused"] == first["sections_reused"] + len(backend.llm_calls[0])
+    assert second["usage"]["attempts"] == 0
+    assert len(backend.charged) == 1
+    assert second["remaining_uses"] == server.FREE_TIER_LIMIT
+
+
+def test_edit_to_near_duplicate_re_evaluates_only_the_edited_section(backend, monkeypatch):
+    original = submit(SECTIONED)
+    backend.near_duplicate = {"id": original["analysis_id"]}
+
+    async def no_previous_results(user_id, role_target, hashes):
+        return {}
+
+    # Only the near-duplicate can seed the section reuse
+    monkeypatch.setattr(server, "find_previous_section_results", no_previous_results)
+    edited = SECTIONED.replace(
+        "- Mentored 3 junior engineers through code reviews and pairing sessions",
+        "- Mentored 4 junior engineers through weekly code reviews and pairing sessions",
+    )
+    result = submit(edited)
+
+    assert backend.llm_calls[-1] == ["experience"]
+    assert result["reused_from"] is None
+    assert result["sections_reused"] == len(backend.llm_calls[0]) - 1
+    assert len(backend.charged) == 2
+
+
+def test_served_near_duplicate_is_not_a_candidate_and_not_charged(backend):
+    original = submit(UNSECTIONED)
+    backend.near_duplicate = {"id": original["analysis_id"]}
+    served = submit(UNSECTIONED.replace("roadmap", "product roadmap", 1))
+
+    assert served["reused_from"] == original["analysis_id"]
+    assert served["usage"]["attempts"] == 0
+    assert len(backend.llm_calls) == 1
+    assert len(backend.charged) == 1
+    assert backend.analyses[original["analysis_id"]]["fingerprint_bands"]
+    assert backend.analyses[served["analysis_id"]]["fingerprint_bands"] == []
+
+
+def test_analysis_route_hides_internal_fields(backend):
+    stored = submit(SECTIONED)
+    analysis = asyncio.run(server.get_analysis(stored["analysis_id"], "user-1"))
+
+    assert analysis["analysis_result"]
+    assert not server.INTERNAL_FIELDS & analysis.keys()
@@ -0,0 +1,36 @@
+from job_matcher import ResumeIndex, jd_keywords, match_resume, resolve_role
+
+
+def test_role_target_wins():
+    assert resolve_role("Senior Product Manager", "Backend Engineer wanted") == "product manager"
+
+
+def test_role_title_in_jd_beats_keyword_overlap():
+    jd = "We are hiring a Backend Engineer to build Python APIs on AWS with Docker and Kubernetes"
+    assert resolve_role(None, jd) == "backend engineer"
+
+
+def test_first_title_named_in_jd_is_used():
+    jd = "Full-stack engineer joining our frontend engineer guild"
+    assert resolve_role(None, jd) == "full stack engineer"
+
+
+def test_role_with_most_keywords_when_no_title():
+    jd = "Looking for someone with pytorch, tensorflow, mlops and llm experience"
+    assert resolve_role(None, jd) == "machine learning engineer"
+
+
+def test_title_without_known_keywords_uses_its_profile():
+    jd = "Data Analyst wanted. Great communication and ownership."
+    role = resolve_role(None, jd)
+    assert role == "data analyst"
+    assert "java" not in jd_keywords(jd, role)
+    assert "tableau" in jd_keywords(jd, role)
+
+
+def test_unrecognised_jd_has_no_role_profile():
+    jd = "Great communication and ownership."
+    assert resolve_role(None, jd) is None
+    result = match_resume("Python developer", jd, None, ResumeIndex())
+    assert result["role_profile"] is None
+    assert result["missing_keywords"] == []
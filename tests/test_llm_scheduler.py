@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+import server
+from server import LLMQueueError, LLMScheduler, QueueTicket
+
+WEIGHTS = {"paid": 4.0, "free": 2.0, "internal": 1.0}
+DEPTHS = {"paid": 1000, "free": 1000, "internal": 1000}
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(server, "DISCONNECT_POLL_SECONDS", 0.01)
+
+
+async def grant_order(scheduler: LLMScheduler, tiers: list[str]) -> list[str]:
+    """Queue one call per entry behind a held slot, then record the order the slots are granted in."""
+    order = []
+
+    async def call(tier: str):
+        async with scheduler.slot(QueueTicket(tier)):
+            order.append(tier)
+            await asyncio.sleep(0)
+
+    await scheduler.acquire(QueueTicket("internal"))
+    calls = [asyncio.create_task(call(tier)) for tier in tiers]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*calls)
+    return order
+
+
+def test_slots_are_shared_by_weight():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        order = await grant_order(scheduler, ["free"] * 70 + ["internal"] * 70 + ["paid"] * 70)
+        return Counter(order[:70]), scheduler
+
+    shares, scheduler = asyncio.run(run())
+    assert 36 <= shares["paid"] <= 44
+    assert 16 <= shares["free"] <= 24
+    assert 6 <= shares["internal"] <= 14
+    assert scheduler.active == 0
+
+
+def test_idle_tier_does_not_starve_others_on_return():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        for _ in range(200):
+            async with scheduler.slot(QueueTicket("free")):
+                pass
+        async with scheduler.slot(QueueTicket("paid")):
+            pass
+        return await grant_order(scheduler, ["free"] * 50 + ["paid"] * 400)
+
+    order = asyncio.run(run())
+    assert order.index("free") < 5
+    assert 40 <= Counter(order[:150])["free"] <= 60
+
+
+def test_full_queue_is_rejected():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, {"paid": 1, "free": 1, "internal": 1})
+        await scheduler.acquire(QueueTicket("paid"))
+        waiting = asyncio.create_task(scheduler.acquire(QueueTicket("free")))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMQueueError) as rejected:
+            await scheduler.acquire(QueueTicket("free"))
+        scheduler.release()
+        await waiting
+        scheduler.release()
+        return rejected.value, scheduler
+
+    error, scheduler = asyncio.run(run())
+    assert error.status_code == 429
+    assert scheduler.stats["free"]["rejected"] == 1
+    assert scheduler.active == 0
+
+
+def test_caller_past_deadline_is_dropped():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        await scheduler.acquire(QueueTicket("paid"))
+        ticket = QueueTicket("free")
+        ticket.deadline = time.monotonic() + 0.05
+        with pytest.raises(LLMQueueError) as dropped:
+            await scheduler.acquire(ticket)
+        scheduler.release()
+        return dropped.value, scheduler
+
+    error, scheduler = asyncio.run(run())
+    assert error.status_code == 503
+    assert scheduler.stats["free"]["expired"] == 1
+    assert scheduler.active == 0
+    assert not scheduler.queues["free"]
+
+
+def test_expired_entry_is_skipped_at_dispatch():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        await scheduler.acquire(QueueTicket("paid"))
+        expired = QueueTicket("free")
+        expired.deadline = time.monotonic()
+        stale = asyncio.create_task(scheduler.acquire(expired))
+        fresh = asyncio.create_task(scheduler.acquire(QueueTicket("internal")))
+        await asyncio.sleep(0)
+        scheduler.release()
+        results = await asyncio.gather(stale, fresh, return_exceptions=True)
+        return results, scheduler
+
+    (stale, fresh), scheduler = asyncio.run(run())
+    assert isinstance(stale, LLMQueueError) and stale.status_code == 503
+    assert fresh is None
+    assert scheduler.active == 1
+
+
+def test_disconnected_caller_is_dropped():
+    async def gone() -> bool:
+        return True
+
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        await scheduler.acquire(QueueTicket("paid"))
+        with pytest.raises(LLMQueueError) as dropped:
+            await scheduler.acquire(QueueTicket("free", gone))
+        scheduler.release()
+        return dropped.value, scheduler
+
+    error, scheduler = asyncio.run(run())
+    assert error.status_code == 503
+    assert scheduler.stats["free"]["expired"] == 1
+    assert scheduler.active == 0
+
+
+def test_grant_racing_cancellation_does_not_leak_the_slot():
+    async def run():
+        scheduler = LLMScheduler(1, WEIGHTS, DEPTHS)
+        await scheduler.acquire(QueueTicket("paid"))
+        first = asyncio.create_task(scheduler.acquire(QueueTicket("free")))
+        second = asyncio.create_task(scheduler.acquire(QueueTicket("free")))
+        await asyncio.sleep(0)
+        # The slot is handed to `first` in the same step it is cancelled
+        first.cancel()
+        scheduler.release()
+        (outcome,) = await asyncio.gather(first, return_exceptions=True)
+        await asyncio.sleep(0)
+        first_holds = not isinstance(outcome, asyncio.CancelledError)
+        holders = int(first_holds) + int(second.done())
+        active = scheduler.active
+        if first_holds:
+            scheduler.release()
+            await second
+        scheduler.release()
+        return holders, active, scheduler
+
+    holders, active, scheduler = asyncio.run(run())
+    assert holders == active == 1
+    assert scheduler.active == 0
+    assert not any(scheduler.queues.values())
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import server
+from server import PDF_MAGIC, UPLOAD_SNIFF_BYTES, PdfSniffer, multipart_boundary
+
+BOUNDARY = b"testboundary"
+
+
+def part(name: str, content: bytes, filename: str = "") -> bytes:
+    disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+    return b"--" + BOUNDARY + f"\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+
+
+def body(*parts: bytes) -> bytes:
+    return b"".join(parts) + b"--" + BOUNDARY + b"--\r\n"
+
+
+def feed_all(data: bytes, sizes: list[int]) -> list:
+    sniffer = PdfSniffer(BOUNDARY)
+    verdicts, position = [], 0
+    for size in sizes:
+        verdicts.append(sniffer.feed(data[position:position + size]))
+        position += size
+    verdicts.append(sniffer.feed(data[position:]))
+    return verdicts
+
+
+def test_multipart_boundary():
+    assert multipart_boundary({b"content-type": b'multipart/form-data; boundary="abc"'}) == b"abc"
+    assert multipart_boundary({b"content-type": b"multipart/form-data; charset=utf-8; boundary=xyz"}) == b"xyz"
+    assert multipart_boundary({b"content-type": b"application/json"}) is None
+
+
+@pytest.mark.parametrize("magic, verdict", [(PDF_MAGIC, True), (b"PK\x03\x04\x14", False)])
+def test_every_split_point_gives_the_same_verdict(magic, verdict):
+    data = body(part("file", magic + b"rest of the file", "resume.pdf"))
+    for split in range(1, len(data)):
+        verdicts = feed_all(data, [split])
+        assert verdicts[-1] is verdict, split
+        assert None not in verdicts[verdicts.index(verdict):]
+
+
+def test_delimiter_and_header_end_split_byte_by_byte():
+    data = body(part("file", PDF_MAGIC + b"1.7", "resume.pdf"))
+    verdicts = feed_all(data, [1] * (len(data) - 1))
+    first = next(i for i, verdict in enumerate(verdicts) if verdict is not None)
+    assert verdicts[first] is True
+    assert first == data.index(PDF_MAGIC) + len(PDF_MAGIC) - 1
+
+
+def test_text_field_before_the_file_part_is_skipped():
+    data = body(part("note", b"%PDF- is not a file"), part("file", b"GIF89a", "resume.pdf"))
+    assert PdfSniffer(BOUNDARY).feed(data) is False
+    data = body(part("note", b"hello"), part("file", PDF_MAGIC + b"1.4", "resume.pdf"))
+    assert PdfSniffer(BOUNDARY).feed(data) is True
+
+
+def test_file_part_shorter_than_the_magic():
+    assert PdfSniffer(BOUNDARY).feed(body(part("file", b"%PD", "resume.pdf"))) is False
+    truncated = b"--" + BOUNDARY + b'\r\nContent-Disposition: form-data; name="file"; filename="a"\r\n\r\n%PD'
+    assert PdfSniffer(BOUNDARY).feed(truncated) is None
+
+
+def test_file_part_after_the_sniff_window_is_left_undecided():
+    data = body(part("note", b"x" * UPLOAD_SNIFF_BYTES), part("file", b"GIF89a", "resume.pdf"))
+    assert feed_all(data, [1000] * (len(data) // 1000)) == [None] * (len(data) // 1000 + 1)
+
+
+async def post_pdf(data: bytes, chunk_size: int = 16 * 1024, headers: list = ()) -> tuple[int, int]:
+    """Stream `data` to /api/analyze/pdf; return (status, bytes the app read)."""
+    chunks = iter([data[i:i + chunk_size] for i in range(0, len(data), chunk_size)])
+    read = 0
+    status = 0
+
+    async def receive():
+        nonlocal read
+        chunk = next(chunks, None)
+        if chunk is None:
+            return {"type": "http.disconnect"}
+        read += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": read < len(data)}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/analyze/pdf", "raw_path": b"/api/analyze/pdf",
+        "query_string": b"user_id=test", "root_path": "", "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+        "headers": [(b"content-type", b"multipart/form-data; boundary=" + BOUNDARY), *headers],
+    }
+    await server.app(scope, receive, send)
+    return status, read
+
+
+@pytest.fixture
+def no_users(monkeypatch):
+    async def get_user_by_id(user_id):
+        return None
+
+    monkeypatch.setattr(server, "get_user_by_id", get_user_by_id)
+
+
+def test_non_pdf_is_rejected_while_streaming(no_users):
+    data = body(part("file", b"PK\x03\x04" + b"0" * (2 * 1024 * 1024), "resume.pdf"))
+    status, read = asyncio.run(post_pdf(data))
+    assert status == 415
+    assert read <= 16 * 1024
+
+
+def test_pdf_passes_the_sniff(no_users):
+    status, _ = asyncio.run(post_pdf(body(part("file", PDF_MAGIC + b"1.4 ...", "resume.pdf"))))
+    assert status == 404  # past the upload checks, at the user lookup
+
+
+def test_short_file_is_rejected(no_users):
+    status, _ = asyncio.run(post_pdf(body(part("file", b"%P", "resume.pdf"))))
+    assert status == 415
+
+
+def test_file_after_the_sniff_window_is_checked_by_the_handler(no_users):
+    data = body(part("note", b"x" * (UPLOAD_SNIFF_BYTES + 1024)), part("file", b"GIF89a", "resume.pdf"))
+    status, read = asyncio.run(post_pdf(data))
+    assert status == 415
+    assert read == len(data)
+
+
+def test_content_length_over_the_limit_is_rejected_before_reading(no_users):
+    data = body(part("file", PDF_MAGIC, "resume.pdf"))
+    headers = [(b"content-length", str(server.MAX_UPLOAD_BYTES + 1).encode())]
+    status, read = asyncio.run(post_pdf(data, headers=headers))
+    assert status == 413
+    assert read == 0